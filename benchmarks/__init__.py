@@ -0,0 +1,4 @@
+"""Offline, reproducible benchmarks for the scraper, embedder and matcher services.
+
+Run `python -m benchmarks run --help` from the repository root.
+"""
@@ -0,0 +1,157 @@
+"""Benchmark runner.
+
+    python -m benchmarks run --scale 10000 --output benchmarks/results/run.json
+    python -m benchmarks compare benchmarks/results/base.json benchmarks/results/run.json
+
+Each suite runs in a fresh subprocess inside its own temporary working
+directory, so ChromaDB and the near-duplicate index start empty and peak RSS
+is attributed to a single service.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.suites import REPO_ROOT
+
+
+SUITES = ("scraper", "embedder", "matcher")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _run_suite(suite: str, suite_args: List[str]) -> Dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    # Keep every run offline.
+    env.setdefault("HF_HUB_OFFLINE", "1")
+    env.setdefault("ANONYMIZED_TELEMETRY", "False")
+
+    with tempfile.TemporaryDirectory(prefix=f"joblens-bench-{suite}-") as workdir:
+        output = os.path.join(workdir, "result.json")
+        subprocess.run(
+            [sys.executable, "-m", f"benchmarks.suites.{suite}", "--output", output, *suite_args],
+            cwd=workdir,
+            env=env,
+            check=True,
+        )
+        with open(output) as fh:
+            return json.load(fh)
+
+
+def run(args: argparse.Namespace) -> None:
+    common = ["--scale", str(args.scale), "--seed", str(args.seed)]
+    per_suite = {
+        "scraper": ["--page-size", str(args.page_size)]
+        + (["--max-requests", str(args.max_requests)] if args.max_requests else [])
+        + (["--fixtures-dir", os.path.abspath(args.fixtures_dir)] if args.fixtures_dir else []),
+        "embedder": ["--queries", str(args.queries), "--encoder", args.encoder],
+        "matcher": ["--queries", str(args.queries)],
+    }
+
+    results = {}
+    for suite in args.suites:
+        print(f"running {suite} suite at scale {args.scale} ...", file=sys.stderr)
+        started = time.perf_counter()
+        results[suite] = _run_suite(suite, common + per_suite[suite])
+        results[suite]["wall_seconds"] = time.perf_counter() - started
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {key: value for key, value in vars(args).items() if key != "func"},
+        },
+        "results": results,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"wrote {args.output}", file=sys.stderr)
+
+
+def compare(args: argparse.Namespace) -> None:
+    """Print per-stage changes in throughput, latency and peak RSS."""
+
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)["results"]
+    with open(args.candidate) as fh:
+        candidate = json.load(fh)["results"]
+
+    def change(old: float, new: float) -> str:
+        if not old:
+            return "n/a"
+        return f"{100.0 * (new - old) / old:+.1f}%"
+
+    header = f"{'suite/stage':<48} {'items/s':>10} {'p50':>10} {'p95':>10} {'p99':>10} {'rss':>10}"
+    print(header)
+    print("-" * len(header))
+    for suite, result in candidate.items():
+        old_stages = baseline.get(suite, {}).get("stages", {})
+        for stage, new in result["stages"].items():
+            old = old_stages.get(stage)
+            if old is None:
+                continue
+            print(
+                f"{suite + '/' + stage:<48} "
+                f"{change(old['items_per_second'], new['items_per_second']):>10} "
+                f"{change(old['latency_ms']['p50'], new['latency_ms']['p50']):>10} "
+                f"{change(old['latency_ms']['p95'], new['latency_ms']['p95']):>10} "
+                f"{change(old['latency_ms']['p99'], new['latency_ms']['p99']):>10} "
+                f"{change(old['peak_rss_mb'], new['peak_rss_mb']):>10}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmark suites")
+    run_parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    run_parser.add_argument(
+        "--scale", type=int, default=10_000, help="Synthetic corpus size (e.g. 10000 to 1000000)"
+    )
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--queries", type=int, default=200)
+    run_parser.add_argument("--page-size", type=int, default=500)
+    run_parser.add_argument("--max-requests", type=int, default=0)
+    run_parser.add_argument("--fixtures-dir", default=None)
+    run_parser.add_argument("--encoder", choices=["hashing", "model"], default="hashing")
+    run_parser.add_argument(
+        "--output",
+        default=os.path.join("benchmarks", "results", time.strftime("%Y%m%d-%H%M%S") + ".json"),
+    )
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+
+# Paths served by the stand-in, matching the real job board APIs.
+REMOTIVE_PATH = "/api/remote-jobs"
+ARBEITNOW_PATH = "/api/job-board-api"
+
+
+def load_recorded_fixtures(fixtures_dir: str) -> Dict[str, bytes]:
+    """Load recorded API responses (`remotive.json`, `arbeitnow.json`)."""
+
+    routes = {}
+    for path, filename in ((REMOTIVE_PATH, "remotive.json"), (ARBEITNOW_PATH, "arbeitnow.json")):
+        full_path = os.path.join(fixtures_dir, filename)
+        if os.path.exists(full_path):
+            with open(full_path, "rb") as fh:
+                routes[path] = fh.read()
+    return routes
+
+
+def encode_routes(payloads: Dict[str, object]) -> Dict[str, bytes]:
+    return {path: json.dumps(payload).encode("utf-8") for path, payload in payloads.items()}
+
+
+@contextmanager
+def serve(routes: Dict[str, bytes], host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """Serve pre-encoded JSON bodies on a local port and yield the base URL.
+
+    Bodies are encoded once up front so the server adds as little as possible
+    to the measured scraper latency. Query strings are ignored.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server API
+            body: Optional[bytes] = routes.get(urlsplit(self.path).path)
+            if body is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args) -> None:  # noqa: A002
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
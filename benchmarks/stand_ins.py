@@ -0,0 +1,47 @@
+import hashlib
+import re
+import sys
+import types
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEncoder:
+    """Offline stand-in for `SentenceTransformer` with the same `encode` API.
+
+    Produces deterministic bag-of-words vectors via feature hashing, so the
+    embedder can be benchmarked end to end without downloading a model. It
+    measures everything around the model, not the model itself.
+    """
+
+    def __init__(self, model_name_or_path: str = "", dim: int = 384, **kwargs) -> None:
+        self.dim = dim
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, **kwargs):
+        import numpy as np
+
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        vectors = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for row, text in enumerate(sentences):
+            for token in _TOKEN_RE.findall(text.lower()):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest()
+                vectors[row, int.from_bytes(digest, "little") % self.dim] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+
+def install_hashing_encoder() -> None:
+    """Make `from sentence_transformers import SentenceTransformer` resolve to
+    `HashingEncoder`. Must run before the embedder's `main` is imported."""
+
+    module = types.ModuleType("sentence_transformers")
+    module.SentenceTransformer = HashingEncoder
+    sys.modules["sentence_transformers"] = module
+
@@ -0,0 +1,84 @@
+import math
+import resource
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (Linux reports KiB)."""
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class StageRecorder:
+    """Collects per-call latencies and item/byte counts for one named stage."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.latencies: List[float] = []
+        self.items = 0
+        self.bytes = 0
+
+    @contextmanager
+    def measure(self, items: int = 1, nbytes: int = 0) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.latencies.append(time.perf_counter() - started)
+            self.items += items
+            self.bytes += nbytes
+
+    def summary(self) -> Dict[str, float]:
+        latencies = sorted(self.latencies)
+        total = sum(latencies)
+        return {
+            "calls": len(latencies),
+            "items": self.items,
+            "bytes": self.bytes,
+            "total_seconds": total,
+            "items_per_second": self.items / total if total else 0.0,
+            "latency_ms": {
+                "mean": 1000 * total / len(latencies) if latencies else 0.0,
+                "p50": 1000 * percentile(latencies, 50),
+                "p95": 1000 * percentile(latencies, 95),
+                "p99": 1000 * percentile(latencies, 99),
+                "max": 1000 * (latencies[-1] if latencies else 0.0),
+            },
+            # Peak RSS of the suite process by the time this stage finished.
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+
+class SuiteRecorder:
+    """Ordered set of stages for one suite run."""
+
+    def __init__(self) -> None:
+        self._stages: Dict[str, StageRecorder] = {}
+        self._summaries: Dict[str, Dict[str, float]] = {}
+
+    def stage(self, name: str) -> StageRecorder:
+        if name not in self._stages:
+            self._stages[name] = StageRecorder(name)
+        return self._stages[name]
+
+    def close(self, name: str) -> None:
+        """Freeze a stage's summary so its peak RSS reflects that point in time."""
+
+        self._summaries[name] = self._stages[name].summary()
+
+    def results(self) -> Dict[str, Dict[str, float]]:
+        for name in self._stages:
+            if name not in self._summaries:
+                self.close(name)
+        return {name: self._summaries[name] for name in self._stages}
@@ -0,0 +1,41 @@
+"""Per-service benchmark suites.
+
+Each suite runs in its own process (see `benchmarks.__main__`), because the
+services use flat layouts with clashing module names (`main`, `models`) and
+because peak RSS is only meaningful per process.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from typing import Dict
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def use_service(name: str) -> None:
+    """Put a service directory first on `sys.path` so `import main` finds it."""
+
+    sys.path.insert(0, os.path.join(REPO_ROOT, name))
+
+
+def base_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--scale", type=int, default=10_000, help="Number of synthetic jobs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="Where to write the JSON result")
+    return parser
+
+
+def write_result(path: str, suite: str, params: Dict, stages: Dict) -> None:
+    result = {
+        "suite": suite,
+        "params": params,
+        "python": platform.python_version(),
+        "stages": stages,
+    }
+    with open(path, "w") as fh:
+        json.dump(result, fh, indent=2)
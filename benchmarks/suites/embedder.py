@@ -0,0 +1,90 @@
+"""Embedder service benchmark: `/embed/jobs`, `/embed/query` and model encode."""
+
+import asyncio
+import os
+
+from benchmarks.stand_ins import install_hashing_encoder
+from benchmarks.stats import SuiteRecorder
+from benchmarks.suites import base_parser, use_service, write_result
+from benchmarks.synthetic import batched, iter_jobs, jobs_to_embed
+
+
+async def _run(args, recorder: SuiteRecorder) -> None:
+    import main
+    from models import EmbedJobsRequest, EmbedQueryRequest, IndexMaintenanceRequest
+
+    jobs = iter_jobs(args.scale, seed=args.seed)
+
+    validation = recorder.stage("pydantic_validation")
+    endpoint = recorder.stage("endpoint.embed_jobs")
+    serialize = recorder.stage("serialization")
+    for batch in batched(jobs, args.batch_size):
+        items = jobs_to_embed(batch)
+        with validation.measure(items=len(items)):
+            payload = EmbedJobsRequest(
+                jobs=items, collapse_duplicates=not args.keep_near_duplicates
+            )
+        with endpoint.measure(items=len(items)):
+            response = await main.embed_jobs(payload)
+        with serialize.measure(items=len(items)):
+            body = response.model_dump_json()
+        serialize.bytes += len(body)
+    for name in ("pydantic_validation", "endpoint.embed_jobs", "serialization"):
+        recorder.close(name)
+
+    # Model encode on its own, per batch size, over a bounded sample.
+    sample = [job["description"] for job in iter_jobs(args.encode_sample, seed=args.seed + 1)]
+    for batch_size in args.encode_batch_sizes:
+        encode = recorder.stage(f"model.encode.batch_{batch_size}")
+        for texts in batched(sample, batch_size):
+            with encode.measure(items=len(texts)):
+                main._model.encode(
+                    texts, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True
+                )
+        recorder.close(f"model.encode.batch_{batch_size}")
+
+    query = recorder.stage("endpoint.embed_query")
+    for job in iter_jobs(args.queries, seed=args.seed + 2):
+        payload = EmbedQueryRequest(text=job["description"])
+        with query.measure():
+            await main.embed_query(payload)
+    recorder.close("endpoint.embed_query")
+
+    maintain = recorder.stage("endpoint.index_maintain")
+    with maintain.measure(items=args.scale):
+        await main.index_maintain(IndexMaintenanceRequest())
+    recorder.close("endpoint.index_maintain")
+
+
+def main() -> None:
+    parser = base_parser(__doc__)
+    parser.add_argument("--batch-size", type=int, default=256, help="Jobs per /embed/jobs call")
+    parser.add_argument("--queries", type=int, default=200, help="Number of /embed/query calls")
+    parser.add_argument("--encode-sample", type=int, default=2048)
+    parser.add_argument(
+        "--encode-batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128]
+    )
+    parser.add_argument(
+        "--encoder",
+        choices=["hashing", "model"],
+        default="hashing",
+        help="'model' uses the real sentence-transformers model from the local cache",
+    )
+    parser.add_argument("--keep-near-duplicates", action="store_true")
+    args = parser.parse_args()
+
+    if args.encoder == "hashing":
+        install_hashing_encoder()
+    else:
+        # Never reach for the network: the model must already be cached.
+        os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    use_service("embedder_service")
+
+    recorder = SuiteRecorder()
+    asyncio.run(_run(args, recorder))
+    write_result(args.output, "embedder", vars(args), recorder.results())
+
+
+if __name__ == "__main__":
+    main()
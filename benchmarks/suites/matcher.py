@@ -0,0 +1,88 @@
+"""Matcher service benchmark: `/match` and `/match-with-rerank` over a synthetic index."""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+
+from benchmarks.stats import SuiteRecorder
+from benchmarks.suites import base_parser, use_service, write_result
+from benchmarks.synthetic import batched, iter_jobs, unit_vectors
+
+
+def _populate(collection, args, recorder: SuiteRecorder) -> None:
+    populate = recorder.stage("setup.populate_index")
+    for index, batch in enumerate(batched(iter_jobs(args.scale, seed=args.seed), args.insert_batch)):
+        vectors = unit_vectors(len(batch), dim=args.dim, seed=args.seed + index + 1)
+        metadatas = [
+            {
+                "title": job["title"],
+                "company": job["company"],
+                "location": job["location"],
+                "job_url": job["url"],
+                "description": job["description"],
+                "requirements": ", ".join(job["skills"]),
+                "source_name": "synthetic",
+                "active": True,
+                "posted_at": int(datetime.fromisoformat(job["posted_at"]).timestamp()),
+            }
+            for job in batch
+        ]
+        with populate.measure(items=len(batch)):
+            collection.add(
+                ids=[job["slug"] for job in batch],
+                embeddings=vectors.tolist(),
+                metadatas=metadatas,
+            )
+    recorder.close("setup.populate_index")
+
+
+async def _run(args, recorder: SuiteRecorder) -> None:
+    from fastapi import BackgroundTasks
+
+    import main
+    from models import MatchRequest
+
+    # Per-request INFO lines would dominate the measured latency.
+    logging.getLogger(main.__name__).setLevel(logging.WARNING)
+
+    _populate(main.chroma_client.get_or_create_collection("jobs"), args, recorder)
+
+    cv_vectors = unit_vectors(args.queries, dim=args.dim, seed=args.seed + 10_000).tolist()
+
+    for name, call in (
+        ("endpoint.match", lambda req: main.match_cv_to_jobs(req, BackgroundTasks())),
+        ("endpoint.match_with_rerank", main.match_and_rerank),
+    ):
+        endpoint = recorder.stage(name)
+        serialize = recorder.stage(f"serialization.{name}")
+        for vector in cv_vectors:
+            request = MatchRequest(cv_embedding=vector, limit=args.limit)
+            with endpoint.measure():
+                response = await call(request)
+            with serialize.measure(items=len(response.jobs)):
+                body = response.model_dump_json()
+            serialize.bytes += len(body)
+        recorder.close(name)
+        recorder.close(f"serialization.{name}")
+
+
+def main() -> None:
+    parser = base_parser(__doc__)
+    parser.add_argument("--queries", type=int, default=200, help="CV vectors to match")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--insert-batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    # The matcher reads its ChromaDB location at import time.
+    os.environ["CHROMADB_PATH"] = os.path.abspath("chroma_data")
+    use_service("matcher_service")
+
+    recorder = SuiteRecorder()
+    asyncio.run(_run(args, recorder))
+    write_result(args.output, "matcher", vars(args), recorder.results())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Scraper service benchmark: `/scrape` against a local stand-in job board."""
+
+import asyncio
+import json
+import math
+
+from benchmarks.mock_server import (
+    ARBEITNOW_PATH,
+    REMOTIVE_PATH,
+    encode_routes,
+    load_recorded_fixtures,
+    serve,
+)
+from benchmarks.stats import SuiteRecorder
+from benchmarks.suites import base_parser, use_service, write_result
+from benchmarks.synthetic import arbeitnow_payload, iter_jobs, remotive_payload
+
+
+# Upper bound of ScrapeRequest.max_jobs.
+MAX_PAGE_SIZE = 500
+
+
+async def _run(args, base_url: str, routes, recorder: SuiteRecorder) -> None:
+    import main
+    import scrapers.arbeitnow as arbeitnow
+    import scrapers.remotive as remotive
+    from models import JobModel, ScrapeRequest
+
+    remotive.REMOTIVE_API_URL = base_url + REMOTIVE_PATH
+    arbeitnow.ARBEITNOW_API_URL = base_url + ARBEITNOW_PATH
+
+    # Each request returns at most one page; enough requests are issued per
+    # source to process `scale` jobs in total, the last one possibly partial.
+    requests = math.ceil(args.scale / args.page_size)
+    if args.max_requests:
+        requests = min(requests, args.max_requests)
+
+    for source in ("remotive", "arbeitnow"):
+        endpoint = recorder.stage(f"endpoint.scrape.{source}")
+        serialize = recorder.stage("serialization")
+        for index in range(requests):
+            max_jobs = min(args.page_size, args.scale - index * args.page_size)
+            payload = ScrapeRequest(source_name=source, max_jobs=max_jobs)
+            with endpoint.measure(items=0):
+                response = await main.scrape_endpoint(payload)
+            endpoint.items += response.job_count
+            with serialize.measure(items=response.job_count):
+                body = response.model_dump_json()
+            serialize.bytes += len(body)
+        recorder.close(f"endpoint.scrape.{source}")
+
+    recorder.close("serialization")
+
+    # Stage breakdown on one page of raw items: HTML parse and validation.
+    raw_items = json.loads(routes[REMOTIVE_PATH])["jobs"]
+    html_parse = recorder.stage("html_parse")
+    validation = recorder.stage("pydantic_validation")
+    for _ in range(requests):
+        for raw in raw_items:
+            html = raw.get("description") or ""
+            with html_parse.measure(nbytes=len(html)):
+                text = remotive._html_to_text(html)
+            with validation.measure():
+                JobModel(
+                    source_name="remotive",
+                    external_id=str(raw.get("id")),
+                    job_url=raw.get("url") or "",
+                    title=raw.get("title") or "",
+                    description=text,
+                    company=raw.get("company_name"),
+                    location=raw.get("candidate_required_location"),
+                )
+    recorder.close("html_parse")
+    recorder.close("pydantic_validation")
+
+
+def main() -> None:
+    parser = base_parser(__doc__)
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=MAX_PAGE_SIZE,
+        help=f"Jobs per API response (clamped to --scale and {MAX_PAGE_SIZE})",
+    )
+    parser.add_argument("--max-requests", type=int, default=0, help="Cap requests per source")
+    parser.add_argument(
+        "--fixtures-dir",
+        default=None,
+        help="Directory with recorded remotive.json / arbeitnow.json responses",
+    )
+    args = parser.parse_args()
+    # ScrapeRequest.max_jobs is capped at 500, and a page larger than the
+    # corpus would process more than `scale` jobs.
+    args.page_size = max(1, min(args.page_size, args.scale, MAX_PAGE_SIZE))
+
+    use_service("scraper_service")
+
+    jobs = list(iter_jobs(args.page_size, seed=args.seed))
+    routes = encode_routes(
+        {REMOTIVE_PATH: remotive_payload(jobs), ARBEITNOW_PATH: arbeitnow_payload(jobs)}
+    )
+    if args.fixtures_dir:
+        routes.update(load_recorded_fixtures(args.fixtures_dir))
+
+    recorder = SuiteRecorder()
+    with serve(routes) as base_url:
+        asyncio.run(_run(args, base_url, routes, recorder))
+
+    write_result(args.output, "scraper", vars(args), recorder.results())
+
+
+if __name__ == "__main__":
+    main()
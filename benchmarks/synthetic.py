@@ -0,0 +1,148 @@
+import itertools
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List
+
+
+_TITLES = [
+    "Backend Engineer", "Frontend Developer", "Data Scientist", "DevOps Engineer",
+    "Machine Learning Engineer", "Product Manager", "QA Engineer", "Site Reliability Engineer",
+    "Mobile Developer", "Data Engineer", "Security Engineer", "Technical Writer",
+]
+_SENIORITY = ["Junior", "Mid-level", "Senior", "Staff", "Lead", "Principal"]
+_SKILLS = [
+    "python", "django", "fastapi", "react", "typescript", "kubernetes", "docker", "aws",
+    "gcp", "postgres", "redis", "kafka", "spark", "pytorch", "tensorflow", "go", "rust",
+    "java", "terraform", "graphql",
+]
+_LOCATIONS = ["Remote", "Berlin", "London", "Nairobi", "New York", "Worldwide", "Europe", "USA Only"]
+_JOB_TYPES = ["full_time", "part_time", "contract", "freelance", "internship"]
+
+
+def _vocabulary(rng: random.Random, size: int = 2000) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set(_SKILLS)
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words)
+
+
+def iter_jobs(count: int, seed: int = 0, description_words: int = 80) -> Iterator[Dict]:
+    """Yield `count` deterministic synthetic jobs in a source-neutral shape.
+
+    Descriptions are random word sequences over a fixed vocabulary, so jobs
+    are not near-duplicates of each other and the dedupe stage keeps them.
+    """
+
+    rng = random.Random(seed)
+    vocab = _vocabulary(rng)
+    epoch = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    for i in range(count):
+        words = rng.choices(vocab, k=description_words)
+        half = description_words // 2
+        skills = rng.sample(_SKILLS, k=4)
+        yield {
+            "id": i,
+            "slug": f"job-{seed}-{i}",
+            "url": f"https://jobs.example.com/{seed}/{i}",
+            "title": f"{rng.choice(_SENIORITY)} {rng.choice(_TITLES)}",
+            "company": f"Company {rng.randint(1, max(1, count // 20))}",
+            "location": rng.choice(_LOCATIONS),
+            "job_type": rng.choice(_JOB_TYPES),
+            "skills": skills,
+            "posted_at": (epoch + timedelta(minutes=rng.randint(0, 525600))).isoformat(),
+            "description_html": (
+                f"<p>{' '.join(words[:half])}</p>"
+                f"<ul>{''.join(f'<li>{s}</li>' for s in skills)}</ul>"
+                f"<p>{' '.join(words[half:])}</p>"
+            ),
+            "description": " ".join(words),
+        }
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Split a (possibly huge) iterable into lists of at most `size` items."""
+
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def remotive_payload(jobs: List[Dict]) -> Dict:
+    """Shape jobs like the Remotive `/api/remote-jobs` response."""
+
+    return {
+        "job-count": len(jobs),
+        "jobs": [
+            {
+                "id": job["id"],
+                "url": job["url"],
+                "title": job["title"],
+                "company_name": job["company"],
+                "category": "Software Development",
+                "tags": job["skills"],
+                "job_type": job["job_type"],
+                "publication_date": job["posted_at"],
+                "candidate_required_location": job["location"],
+                "salary": "",
+                "description": job["description_html"],
+            }
+            for job in jobs
+        ],
+    }
+
+
+def arbeitnow_payload(jobs: List[Dict]) -> Dict:
+    """Shape jobs like the Arbeitnow `/api/job-board-api` response."""
+
+    return {
+        "data": [
+            {
+                "slug": job["slug"],
+                "company_name": job["company"],
+                "title": job["title"],
+                "description": job["description_html"],
+                "remote": job["location"] == "Remote",
+                "url": job["url"],
+                "tags": job["skills"],
+                "job_types": [job["job_type"]],
+                "location": job["location"],
+                "created_at": job["posted_at"],
+            }
+            for job in jobs
+        ],
+        "links": {},
+        "meta": {},
+    }
+
+
+def jobs_to_embed(jobs: List[Dict]) -> List[Dict]:
+    """Shape jobs like the `/embed/jobs` request items."""
+
+    return [
+        {
+            "id": job["slug"],
+            "title": job["title"],
+            "description": job["description"],
+            "company": job["company"],
+            "location": job["location"],
+            "source_name": "synthetic",
+            "posted_at": job["posted_at"],
+        }
+        for job in jobs
+    ]
+
+
+def unit_vectors(count: int, dim: int = 384, seed: int = 0):
+    """Deterministic L2-normalised float32 vectors, e.g. CV or job embeddings."""
+
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
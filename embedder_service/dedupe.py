@@ -0,0 +1,342 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import JobToEmbed
+
+
+# Hash family (a * x + b) mod P over 31-bit values keeps every product inside
+# uint64, so signatures can be computed with plain numpy arithmetic.
+_PRIME = np.uint64((1 << 31) - 1)
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def shingles(job: JobToEmbed, size: int = 3) -> List[str]:
+    """Word n-grams over the normalised title, company and description."""
+
+    text = " ".join(part for part in (job.title, job.company, job.description) if part)
+    tokens = _TOKEN_RE.findall(text.lower())
+    if len(tokens) <= size:
+        return [" ".join(tokens)]
+    return [" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)]
+
+
+def title_key(job: JobToEmbed) -> str:
+    """Normalised title; only jobs with the same title are ever collapsed.
+
+    A long shared description (e.g. a company boilerplate) otherwise
+    dominates the shingles and makes different roles look identical.
+    """
+
+    return " ".join(_TOKEN_RE.findall(job.title.lower()))
+
+
+# (job id, normalised title, uint32 MinHash signature bytes, LSH band keys).
+# Plain picklable values, so hashing can run in a serve.py worker while only
+# the lookup/insert runs in the writer process.
+PreparedJob = Tuple[str, str, bytes, List[int]]
+
+
+class MinHasher:
+    """Computes MinHash signatures and LSH band keys for jobs.
+
+    Pure CPU work with no storage, so it can run wherever the jobs are.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.params = f"{num_perm}:{bands}:{shingle_size}:{seed}"
+
+        # Fixed seed: stored signatures must stay comparable between runs.
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_PRIME), size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_PRIME), size=num_perm).astype(np.uint64)
+
+    def signature(self, job: JobToEmbed) -> np.ndarray:
+        hashes = np.array(
+            [zlib.crc32(s.encode("utf-8")) for s in shingles(job, self.shingle_size)],
+            dtype=np.uint64,
+        ) % _PRIME
+        values = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return values.min(axis=1).astype(np.uint32)
+
+    def band_keys(self, sig: np.ndarray) -> List[int]:
+        keys = []
+        for band in range(self.bands):
+            chunk = sig[band * self.rows : (band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8).digest()
+            keys.append(int.from_bytes(digest, "big", signed=True))
+        return keys
+
+    def prepare(self, jobs: List[JobToEmbed]) -> List[PreparedJob]:
+        prepared = []
+        for job in jobs:
+            sig = self.signature(job)
+            prepared.append((job.id, title_key(job), sig.tobytes(), self.band_keys(sig)))
+        return prepared
+
+
+class NearDuplicateIndex:
+    """MinHash/LSH index that maps near-duplicate jobs to a canonical id.
+
+    Signatures and LSH band buckets are stored in SQLite so the index is
+    maintained incrementally across runs and restarts. A job is a duplicate
+    when it shares at least one band bucket with an indexed job of the same
+    collection, has the same normalised title, and their estimated Jaccard
+    similarity reaches `threshold`.
+
+    With the defaults (16 bands of 8 rows) the LSH candidate threshold is
+    about 0.7, just below the 0.8 acceptance threshold.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        num_perm: int = 128,
+        bands: int = 16,
+        threshold: float = 0.8,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ) -> None:
+        self.hasher = MinHasher(num_perm, bands, shingle_size, seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._init_schema()
+
+    def _init_schema(self) -> None:
+        with self._conn:
+            columns = [
+                row[1] for row in self._conn.execute("PRAGMA table_info(signatures)").fetchall()
+            ]
+            if columns and "collection" not in columns:
+                # Pre-collection layout: start over. Jobs simply become
+                # canonical again the next time they are embedded.
+                self._conn.executescript(
+                    """
+                    DROP TABLE signatures;
+                    DROP TABLE IF EXISTS buckets;
+                    DROP TABLE IF EXISTS canonical;
+                    """
+                )
+
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS signatures (
+                    collection TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    title_key TEXT NOT NULL,
+                    sig BLOB NOT NULL,
+                    PRIMARY KEY (collection, id)
+                );
+                CREATE TABLE IF NOT EXISTS buckets (
+                    collection TEXT NOT NULL,
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    id TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_buckets_lookup ON buckets(collection, band, bucket);
+                CREATE INDEX IF NOT EXISTS idx_buckets_id ON buckets(collection, id);
+                CREATE TABLE IF NOT EXISTS canonical (
+                    collection TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    canonical_id TEXT NOT NULL,
+                    PRIMARY KEY (collection, id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_canonical_target ON canonical(collection, canonical_id);
+                """
+            )
+            params = f"{self.num_perm}:{self.bands}"
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'params'").fetchone()
+            if row is None:
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('params', ?)", (params,))
+            elif row[0] != params:
+                raise ValueError(
+                    f"Near-duplicate index was built with num_perm:bands={row[0]}, not {params}"
+                )
+
+    def canonical_id(self, collection: str, job_id: str) -> Optional[str]:
+        """Return the canonical id a job was collapsed into, if any."""
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT canonical_id FROM canonical WHERE collection = ? AND id = ?",
+                (collection, job_id),
+            ).fetchone()
+        return row[0] if row else None
+
+    def check_many(self, collection: str, jobs: List[JobToEmbed]) -> Dict[str, str]:
+        """Index `jobs` and return a duplicate id -> canonical id map.
+
+        Jobs that are not duplicates become canonical themselves. Ids that are
+        already canonical are re-indexed with their current content and never
+        collapsed, so re-embedding an existing job always goes through. The
+        whole batch is written in one transaction; later jobs in the batch
+        can collapse into earlier ones.
+
+        Callers register jobs before their vectors are stored, and must
+        `remove()` the non-duplicate ids again if encoding or the upsert
+        fails.
+        """
+
+        return self.check_prepared(collection, self.hasher.prepare(jobs))
+
+    def check_prepared(self, collection: str, prepared: List[PreparedJob]) -> Dict[str, str]:
+        """`check_many` for jobs already hashed with `hasher.prepare`."""
+
+        duplicates: Dict[str, str] = {}
+        with self._lock, self._conn:
+            for job_id, key, sig_bytes, bands in prepared:
+                sig = np.frombuffer(sig_bytes, dtype=np.uint32)
+                match = self._check_and_add(collection, job_id, key, sig, bands)
+                if match is not None:
+                    duplicates[job_id] = match
+        return duplicates
+
+    def check_and_add(self, collection: str, job: JobToEmbed) -> Optional[str]:
+        """Index one job; see `check_many`."""
+
+        return self.check_many(collection, [job]).get(job.id)
+
+    def _check_and_add(
+        self, collection: str, job_id: str, key: str, sig: np.ndarray, bands: List[int]
+    ) -> Optional[str]:
+        is_canonical = self._conn.execute(
+            "SELECT 1 FROM signatures WHERE collection = ? AND id = ?", (collection, job_id)
+        ).fetchone()
+        self._conn.execute(
+            "DELETE FROM canonical WHERE collection = ? AND id = ?", (collection, job_id)
+        )
+
+        if not is_canonical:
+            match = self._best_match(collection, job_id, key, sig, bands)
+            if match is not None:
+                self._conn.execute(
+                    "INSERT INTO canonical (collection, id, canonical_id) VALUES (?, ?, ?)",
+                    (collection, job_id, match),
+                )
+                return match
+
+        self._conn.execute(
+            "DELETE FROM buckets WHERE collection = ? AND id = ?", (collection, job_id)
+        )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO signatures (collection, id, title_key, sig) VALUES (?, ?, ?, ?)",
+            (collection, job_id, key, sig.tobytes()),
+        )
+        self._conn.executemany(
+            "INSERT INTO buckets (collection, band, bucket, id) VALUES (?, ?, ?, ?)",
+            [(collection, band, bucket, job_id) for band, bucket in enumerate(bands)],
+        )
+        return None
+
+    def remove(self, collection: str, job_ids: List[str]) -> None:
+        """Forget jobs, e.g. after they expire from the vector index.
+
+        Duplicates that pointed at a removed canonical job are dropped as
+        well, so they are re-evaluated the next time they are seen.
+        """
+
+        if not job_ids:
+            return
+        with self._lock, self._conn:
+            params = [(collection, job_id) for job_id in job_ids]
+            self._conn.executemany(
+                "DELETE FROM signatures WHERE collection = ? AND id = ?", params
+            )
+            self._conn.executemany("DELETE FROM buckets WHERE collection = ? AND id = ?", params)
+            self._conn.executemany("DELETE FROM canonical WHERE collection = ? AND id = ?", params)
+            self._conn.executemany(
+                "DELETE FROM canonical WHERE collection = ? AND canonical_id = ?", params
+            )
+
+    def _best_match(
+        self, collection: str, job_id: str, key: str, sig: np.ndarray, bands: List[int]
+    ) -> Optional[str]:
+        candidates = set()
+        for band, bucket in enumerate(bands):
+            rows = self._conn.execute(
+                "SELECT id FROM buckets WHERE collection = ? AND band = ? AND bucket = ?",
+                (collection, band, bucket),
+            ).fetchall()
+            candidates.update(row[0] for row in rows)
+        candidates.discard(job_id)
+
+        best_id, best_score = None, self.threshold
+        for candidate in candidates:
+            row = self._conn.execute(
+                "SELECT title_key, sig FROM signatures WHERE collection = ? AND id = ?",
+                (collection, candidate),
+            ).fetchone()
+            if row is None or row[0] != key:
+                continue
+            other = np.frombuffer(row[1], dtype=np.uint32)
+            score = float(np.mean(other == sig))
+            if score >= best_score:
+                best_id, best_score = candidate, score
+        return best_id
+
+
+_index: Optional[NearDuplicateIndex] = None
+
+
+def open_index() -> NearDuplicateIndex:
+    """Open the index stored at `NEAR_DUPLICATE_INDEX_PATH`."""
+
+    return NearDuplicateIndex(
+        path=os.getenv("NEAR_DUPLICATE_INDEX_PATH", "near_duplicates.db"),
+        threshold=float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8")),
+    )
+
+
+def get_index() -> NearDuplicateIndex:
+    """Return the process-wide near-duplicate index.
+
+    Under `serve.py` this is a proxy to the index owned by the single writer
+    process (see `vector_store.py`), so workers never race on the SQLite file.
+    """
+
+    global _index
+
+    if _index is None:
+        # Imported here: vector_store imports this module in the writer.
+        from vector_store import near_duplicates_from_env
+
+        _index = near_duplicates_from_env() or open_index()
+    return _index
+
+
+def collapse_near_duplicates(
+    jobs: List[JobToEmbed], index: NearDuplicateIndex, collection: str
+) -> Tuple[List[JobToEmbed], Dict[str, str]]:
+    """Split `jobs` into ones to embed and a duplicate -> canonical id map.
+
+    Runs synchronous SQLite I/O; call it via `asyncio.to_thread` from
+    request handlers.
+    """
+
+    duplicates = index.check_many(collection, jobs)
+    unique = [job for job in jobs if job.id not in duplicates]
+    return unique, duplicates
@@ -0,0 +1,262 @@
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from dedupe import NearDuplicateIndex
+from models import IndexMaintenanceResponse
+
+
+# Vectors are never deleted directly on expiry. They are first tombstoned
+# (`active=False`, `expired_at=<epoch>`) so the matcher stops returning them
+# immediately, then purged in batches once the grace period has passed. A job
+# that is re-embedded during the grace period simply becomes active again.
+ACTIVE_WHERE = {"active": True}
+
+# Collection queried by the matcher.
+DEFAULT_COLLECTION = "jobs"
+
+logger = logging.getLogger(__name__)
+
+
+def _epoch(dt: datetime) -> int:
+    return int(dt.timestamp())
+
+
+def _tombstone(
+    collection,
+    ids: List[str],
+    now: int,
+    batch_size: int,
+    near_duplicates: Optional[NearDuplicateIndex],
+) -> int:
+    """Mark `ids` inactive and stop them acting as near-duplicate canonicals.
+
+    The matcher no longer returns a tombstoned job, so a live repost must not
+    be collapsed into it during the grace period.
+    """
+
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start : start + batch_size]
+        collection.update(
+            ids=batch,
+            metadatas=[{"active": False, "expired_at": now} for _ in batch],
+        )
+        if near_duplicates is not None:
+            near_duplicates.remove(collection.name, batch)
+    return len(ids)
+
+
+def expire_jobs(
+    collection,
+    retention_days: int,
+    batch_size: int = 500,
+    near_duplicates: Optional[NearDuplicateIndex] = None,
+) -> int:
+    """Tombstone active jobs posted more than `retention_days` ago."""
+
+    now = datetime.now(timezone.utc)
+    cutoff = _epoch(now - timedelta(days=retention_days))
+    where = {"$and": [ACTIVE_WHERE, {"posted_at": {"$lt": cutoff}}]}
+
+    expired = 0
+    while True:
+        ids = collection.get(where=where, limit=batch_size, include=[])["ids"]
+        if not ids:
+            return expired
+        expired += _tombstone(collection, ids, _epoch(now), batch_size, near_duplicates)
+
+
+def deactivate_jobs(
+    collection,
+    ids: List[str],
+    batch_size: int = 500,
+    near_duplicates: Optional[NearDuplicateIndex] = None,
+) -> int:
+    """Tombstone specific jobs, e.g. rows flipped to `raw_jobs.is_active = false`."""
+
+    existing = collection.get(ids=list(ids), include=[])["ids"]
+    return _tombstone(
+        collection, existing, _epoch(datetime.now(timezone.utc)), batch_size, near_duplicates
+    )
+
+
+def purge_tombstones(
+    collection,
+    grace_days: int,
+    batch_size: int = 500,
+    near_duplicates: Optional[NearDuplicateIndex] = None,
+) -> int:
+    """Delete tombstoned vectors whose grace period has passed, in batches.
+
+    Purged ids are also dropped from the near-duplicate index (tombstoning
+    already does this; it is repeated for tombstones that predate it) so
+    reposts are not collapsed into a vector that no longer exists.
+    """
+
+    cutoff = _epoch(datetime.now(timezone.utc) - timedelta(days=grace_days))
+    where = {"$and": [{"active": False}, {"expired_at": {"$lte": cutoff}}]}
+
+    purged = 0
+    while True:
+        ids = collection.get(where=where, limit=batch_size, include=[])["ids"]
+        if not ids:
+            return purged
+        collection.delete(ids=ids)
+        if near_duplicates is not None:
+            near_duplicates.remove(collection.name, ids)
+        purged += len(ids)
+
+
+def backfill_lifecycle_metadata(collection, batch_size: int = 500) -> int:
+    """Add `active`/`posted_at` to vectors embedded before expiry existed.
+
+    Legacy vectors are treated as posted now, so they age out after one
+    retention period instead of all expiring at once. The matcher filters on
+    `active`, so this runs on embedder startup and on every maintenance pass
+    by default; vectors that already carry both fields are left untouched.
+    """
+
+    now = _epoch(datetime.now(timezone.utc))
+    updated = 0
+    offset = 0
+    while True:
+        page = collection.get(limit=batch_size, offset=offset, include=["metadatas"])
+        if not page["ids"]:
+            return updated
+        offset += len(page["ids"])
+
+        ids, metadatas = [], []
+        for job_id, metadata in zip(page["ids"], page["metadatas"]):
+            metadata = metadata or {}
+            if "active" in metadata and "posted_at" in metadata:
+                continue
+            ids.append(job_id)
+            metadatas.append(
+                {
+                    "active": metadata.get("active", True),
+                    "posted_at": metadata.get("posted_at", now),
+                }
+            )
+        if ids:
+            collection.update(ids=ids, metadatas=metadatas)
+            updated += len(ids)
+
+
+def backfill_on_startup(client, name: str = DEFAULT_COLLECTION) -> None:
+    """Backfill `name` once at startup, logging instead of raising."""
+
+    try:
+        count = backfill_lifecycle_metadata(client.get_or_create_collection(name))
+    except Exception:
+        logger.exception("Lifecycle metadata backfill failed")
+        return
+    if count:
+        logger.info("Backfilled lifecycle metadata on %d vectors", count)
+
+
+def compact_collection(
+    client,
+    name: str,
+    batch_size: int = 500,
+    near_duplicates: Optional[NearDuplicateIndex] = None,
+):
+    """Rebuild `name` from its active vectors only.
+
+    Deleted vectors still occupy space in the HNSW index until it is rebuilt,
+    so query cost tracks history rather than the live job count. Active
+    vectors are copied into a fresh collection which then takes over the
+    original name.
+
+    `client` must be a raw ChromaDB client and nothing else may write to it
+    meanwhile; call it through `VectorStore.compact`, which holds the write
+    lock for the duration. Reads issued during the final swap may briefly
+    fail.
+
+    Every id that is not copied is dropped from the near-duplicate index as
+    well, so reposts of those jobs are embedded again.
+    """
+
+    source = client.get_collection(name)
+    staging_name = f"{name}__compacting"
+    try:
+        client.delete_collection(staging_name)
+    except ValueError:
+        # No leftover from an interrupted compaction.
+        pass
+    staging = client.create_collection(staging_name, metadata=source.metadata)
+
+    kept = set()
+    offset = 0
+    while True:
+        page = source.get(
+            where=ACTIVE_WHERE,
+            limit=batch_size,
+            offset=offset,
+            include=["embeddings", "metadatas"],
+        )
+        if not page["ids"]:
+            break
+        offset += len(page["ids"])
+        kept.update(page["ids"])
+        staging.add(
+            ids=page["ids"],
+            embeddings=page["embeddings"],
+            metadatas=page["metadatas"],
+        )
+
+    dropped: List[str] = []
+    if near_duplicates is not None:
+        offset = 0
+        while True:
+            ids = source.get(limit=batch_size, offset=offset, include=[])["ids"]
+            if not ids:
+                break
+            offset += len(ids)
+            dropped.extend(job_id for job_id in ids if job_id not in kept)
+
+    client.delete_collection(name)
+    staging.modify(name=name)
+
+    if near_duplicates is not None:
+        for start in range(0, len(dropped), batch_size):
+            near_duplicates.remove(name, dropped[start : start + batch_size])
+    return staging
+
+
+def maintain_index(
+    client,
+    collection_name: str,
+    retention_days: int,
+    grace_days: int,
+    batch_size: int = 500,
+    compact: bool = False,
+    backfill: bool = True,
+    near_duplicates: Optional[NearDuplicateIndex] = None,
+) -> IndexMaintenanceResponse:
+    """Run one maintenance pass: backfill, expire, purge and optionally compact.
+
+    `client` is a `vector_store.LocalClient` or `RemoteClient`. Blocking;
+    call it via `asyncio.to_thread` from request handlers.
+    """
+
+    started = time.perf_counter()
+    collection = client.get_or_create_collection(collection_name)
+
+    backfilled = backfill_lifecycle_metadata(collection, batch_size) if backfill else 0
+    expired = expire_jobs(collection, retention_days, batch_size, near_duplicates)
+    purged = purge_tombstones(collection, grace_days, batch_size, near_duplicates)
+    if compact:
+        # Runs inside the VectorStore (the writer process under serve.py),
+        # which also drops the removed ids from its near-duplicate index.
+        collection = client.compact(collection_name, batch_size)
+
+    return IndexMaintenanceResponse(
+        collection_name=collection_name,
+        backfilled=backfilled,
+        expired=expired,
+        purged=purged,
+        compacted=compact,
+        total=collection.count(),
+        elapsed_seconds=time.perf_counter() - started,
+    )
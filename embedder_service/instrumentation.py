@@ -0,0 +1,163 @@
+"""Hot-path instrumentation shared by the JobLens services.
+
+This file is kept identical in scraper_service, embedder_service and
+matcher_service (each service is built from its own directory). The copies
+must stay in sync: the embedder's ingestion pipeline runs the scraper code
+in-process against the embedder's copy, and refuses to start if the scraper's
+copy differs. Edit one copy and then copy it over the other two.
+
+- `span(name)` times a block into the `joblens_span_seconds` histogram and
+  counts items/bytes processed. With `METRICS_ENABLED=false` it returns a
+  shared no-op object, so instrumented code pays one function call.
+- `setup(app)` adds a Prometheus `GET /metrics` endpoint and, only when
+  `PROFILING_ENABLED=true`, a middleware that profiles requests sent with an
+  `X-Profile: 1` header using pyinstrument's sampling profiler.
+- `InstrumentedJSONResponse` times response serialization.
+"""
+
+import os
+import time
+from typing import Any, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+# From 100µs (HTML parse of one job) up to 30s (large encode batches).
+_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+SPAN_SECONDS = Histogram(
+    "joblens_span_seconds", "Time spent in named hot-path spans", ["span"], buckets=_BUCKETS
+)
+SPAN_ITEMS = Counter("joblens_span_items_total", "Items processed in named spans", ["span"])
+SPAN_BYTES = Counter("joblens_span_bytes_total", "Bytes processed in named spans", ["span"])
+
+
+class Span:
+    """Context manager recording one timed span.
+
+    `items` and `nbytes` may be set inside the block when they are only
+    known once the work is done.
+    """
+
+    __slots__ = ("name", "items", "nbytes", "_started")
+
+    def __init__(self, name: str, items: int = 0, nbytes: int = 0) -> None:
+        self.name = name
+        self.items = items
+        self.nbytes = nbytes
+
+    def __enter__(self) -> "Span":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        SPAN_SECONDS.labels(self.name).observe(time.perf_counter() - self._started)
+        if self.items:
+            SPAN_ITEMS.labels(self.name).inc(self.items)
+        if self.nbytes:
+            SPAN_BYTES.labels(self.name).inc(self.nbytes)
+
+
+class _NoopSpan:
+    __slots__ = ("items", "nbytes")
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, items: int = 0, nbytes: int = 0):
+    """Time a block as span `name`, e.g. `with span("chroma_query"): ...`."""
+
+    if not METRICS_ENABLED:
+        return _NOOP
+    return Span(name, items, nbytes)
+
+
+def batch_bucket(size: int) -> str:
+    """Power-of-two bucket for batch sizes, keeping span names low-cardinality."""
+
+    bucket = 1
+    while bucket < size:
+        bucket *= 2
+    return str(bucket)
+
+
+class InstrumentedJSONResponse(JSONResponse):
+    """JSONResponse that records rendering time and body size as `serialization`."""
+
+    def render(self, content: Any) -> bytes:
+        with span("serialization") as s:
+            body = super().render(content)
+            s.nbytes = len(body)
+        return body
+
+
+def _registry() -> Optional[CollectorRegistry]:
+    # Under multiple worker processes each one writes its samples to
+    # PROMETHEUS_MULTIPROC_DIR and /metrics aggregates them.
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return None
+    from prometheus_client import multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def setup(app: FastAPI, service: str) -> None:
+    """Expose `/metrics` and, if enabled, the per-request profiler hook."""
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        registry = _registry()
+        body = generate_latest(registry) if registry is not None else generate_latest()
+        return Response(content=body, media_type=CONTENT_TYPE_LATEST)
+
+    if not PROFILING_ENABLED:
+        return
+
+    @app.middleware("http")
+    async def profile_request(request: Request, call_next):
+        if request.headers.get("x-profile") != "1":
+            return await call_next(request)
+
+        # Imported lazily: pyinstrument is only needed when profiling is on.
+        from pyinstrument import Profiler
+
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            profiler.stop()
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(
+            PROFILE_DIR,
+            f"{service}-{request.url.path.strip('/').replace('/', '_') or 'root'}-{time.time_ns()}.html",
+        )
+        with open(path, "w") as fh:
+            fh.write(profiler.output_html())
+        response.headers["X-Profile-Report"] = path
+        return response
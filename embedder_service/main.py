@@ -1,32 +1,72 @@
+import asyncio
+import logging
+import os
 from typing import List
 
-import chromadb
-from fastapi import FastAPI, UploadFile
+from fastapi import FastAPI, HTTPException, UploadFile
 from sentence_transformers import SentenceTransformer
 
 # Import at the function level to avoid startup issues if libraries are missing
 from io import BytesIO
-import traceback
 
 from models import (
+    DeactivateJobsRequest,
+    DeactivateJobsResponse,
     EmbedJobsRequest,
     EmbedJobsResponse,
     EmbedQueryRequest,
     EmbedQueryResponse,
+    IndexMaintenanceRequest,
+    IndexMaintenanceResponse,
+    PipelineRunRequest,
+    PipelineRunResponse,
 )
+from dedupe import collapse_near_duplicates, get_index
+from instrumentation import (
+    InstrumentedJSONResponse,
+    batch_bucket,
+    setup as setup_instrumentation,
+    span,
+)
+from index_maintenance import backfill_on_startup, deactivate_jobs, maintain_index
+from pipeline import (
+    ScraperUnavailableError,
+    UnsupportedSourceError,
+    close_persistence,
+    job_metadata,
+    run_pipeline,
+)
+from vector_store import LocalClient, VectorStore, client_from_env
 
 
-app = FastAPI(title="Embedding Service", version="0.1.0")
+logger = logging.getLogger(__name__)
 
+app = FastAPI(
+    title="Embedding Service",
+    version="0.1.0",
+    default_response_class=InstrumentedJSONResponse,
+)
+setup_instrumentation(app, service="embedder")
 
-# Initialise ChromaDB persistent client and collection
-_client = chromadb.PersistentClient(path="chroma_data")
+
+# Initialise ChromaDB persistent client and collection. All access goes
+# through a VectorStore, which serialises writes; under serve.py it lives in
+# the single writer process and the client is a proxy to it.
+# serve.py opens the same CHROMADB_PATH in its writer process.
+_client = client_from_env() or LocalClient(
+    VectorStore(os.getenv("CHROMADB_PATH", "chroma_data"), near_duplicates=get_index())
+)
 
 
 def _get_collection(name: str):
     return _client.get_or_create_collection(name)
 
 
+# Index lifecycle defaults, overridable per /index/maintain request
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "30"))
+TOMBSTONE_GRACE_DAYS = int(os.getenv("TOMBSTONE_GRACE_DAYS", "7"))
+
+
 # Load a small, CPU-friendly sentence transformer model once at startup
 _model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
 
@@ -36,37 +76,128 @@ async def health_check() -> dict:
     return {"status": "ok"}
 
 
+_startup_tasks = set()
+
+
+@app.on_event("startup")
+async def startup() -> None:
+    # The matcher only returns vectors with `active=True`; add the flag to
+    # vectors indexed before it existed. Runs in the background so the
+    # service is ready immediately, and is a no-op once every vector has it.
+    # Under serve.py the writer process does this once for all workers.
+    if not isinstance(_client, LocalClient):
+        return
+    task = asyncio.create_task(asyncio.to_thread(backfill_on_startup, _client))
+    _startup_tasks.add(task)
+    task.add_done_callback(_startup_tasks.discard)
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await close_persistence()
+
+
 @app.post("/embed/jobs", response_model=EmbedJobsResponse)
 async def embed_jobs(payload: EmbedJobsRequest) -> EmbedJobsResponse:
     collection = _get_collection(payload.collection_name)
 
-    texts: List[str] = [job.as_text() for job in payload.jobs]
-    ids: List[str] = [job.id for job in payload.jobs]
-    metadatas = [
-        {
-            "title": job.title,
-            "company": job.company,
-            "location": job.location,
-            "source_name": job.source_name,
-        }
-        for job in payload.jobs
-    ]
+    jobs = payload.jobs
+    duplicates = {}
+    if payload.collapse_duplicates:
+        with span("near_duplicate_check", items=len(jobs)):
+            jobs, duplicates = await asyncio.to_thread(
+                collapse_near_duplicates, jobs, get_index(), payload.collection_name
+            )
 
-    embeddings = _model.encode(
-        texts,
-        batch_size=32,
-        show_progress_bar=False,
-        convert_to_numpy=True,
-    ).tolist()
+    texts: List[str] = [job.as_text() for job in jobs]
+    ids: List[str] = [job.id for job in jobs]
+    metadatas = [job_metadata(job) for job in jobs]
 
-    collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas)
+    if ids:
+        try:
+            with span(f"model_encode_batch_{batch_bucket(len(texts))}", items=len(texts)):
+                embeddings = _model.encode(
+                    texts,
+                    batch_size=32,
+                    show_progress_bar=False,
+                    convert_to_numpy=True,
+                ).tolist()
+
+            with span("chroma_upsert", items=len(ids)):
+                collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas)
+        except Exception:
+            if payload.collapse_duplicates:
+                # The batch was registered as canonical before encoding; don't
+                # let later reposts collapse into vectors that were never written.
+                await asyncio.to_thread(get_index().remove, payload.collection_name, ids)
+            raise
+
+    return EmbedJobsResponse(
+        collection_name=payload.collection_name,
+        count=len(ids),
+        duplicates=duplicates,
+    )
+
+
+@app.post("/pipeline/run", response_model=PipelineRunResponse)
+async def pipeline_run(payload: PipelineRunRequest) -> PipelineRunResponse:
+    """Scrape and embed jobs in-process, bypassing the n8n HTTP hops."""
 
-    return EmbedJobsResponse(collection_name=payload.collection_name, count=len(ids))
+    try:
+        return await run_pipeline(
+            model=_model,
+            collection=_get_collection(payload.collection_name),
+            sources=payload.sources,
+            max_jobs=payload.max_jobs,
+            since=payload.since,
+            batch_size=payload.batch_size,
+            queue_size=payload.queue_size,
+            near_duplicates=get_index() if payload.collapse_duplicates else None,
+        )
+    except UnsupportedSourceError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except ScraperUnavailableError as exc:
+        # The embedder image alone does not ship the scraper code, and the
+        # pipeline needs DATABASE_URL to write raw_jobs.
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+
+@app.post("/index/maintain", response_model=IndexMaintenanceResponse)
+async def index_maintain(payload: IndexMaintenanceRequest) -> IndexMaintenanceResponse:
+    """Expire old jobs, purge tombstones and optionally compact the index.
+
+    Intended to be scheduled (e.g. daily from n8n) so index size tracks the
+    live job count rather than history.
+    """
+
+    return await asyncio.to_thread(
+        maintain_index,
+        client=_client,
+        collection_name=payload.collection_name,
+        retention_days=payload.retention_days or JOB_RETENTION_DAYS,
+        grace_days=(
+            payload.grace_days if payload.grace_days is not None else TOMBSTONE_GRACE_DAYS
+        ),
+        batch_size=payload.batch_size,
+        compact=payload.compact,
+        backfill=payload.backfill,
+        near_duplicates=get_index(),
+    )
+
+
+@app.post("/index/deactivate", response_model=DeactivateJobsResponse)
+async def index_deactivate(payload: DeactivateJobsRequest) -> DeactivateJobsResponse:
+    collection = _get_collection(payload.collection_name)
+    count = await asyncio.to_thread(
+        deactivate_jobs, collection, payload.ids, near_duplicates=get_index()
+    )
+    return DeactivateJobsResponse(collection_name=payload.collection_name, count=count)
 
 
 @app.post("/embed/query", response_model=EmbedQueryResponse)
 async def embed_query(payload: EmbedQueryRequest) -> EmbedQueryResponse:
-    embedding = _model.encode([payload.text], convert_to_numpy=True)[0].tolist()
+    with span("model_encode_batch_1", items=1, nbytes=len(payload.text)):
+        embedding = _model.encode([payload.text], convert_to_numpy=True)[0].tolist()
     return EmbedQueryResponse(embedding=embedding)
 
 
@@ -110,12 +241,12 @@ async def embed_cv(file: UploadFile):
         except ImportError as e:
             raise HTTPException(status_code=500, detail=f"Required library not available: {str(e)}")
         except Exception as e:
-            print(f"Error processing file: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Error processing file")
             raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
         
         # Generate embedding for the extracted text
-        embedding = _model.encode([text], convert_to_numpy=True)[0].tolist()
+        with span("model_encode_batch_1", items=1, nbytes=len(text)):
+            embedding = _model.encode([text], convert_to_numpy=True)[0].tolist()
         
         return EmbedQueryResponse(embedding=embedding)
         
@@ -1,4 +1,5 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -19,6 +20,9 @@ class JobToEmbed(BaseModel):
     source_name: Optional[str] = Field(
         None, description="Name of the job source (e.g. remotive, arbeitnow)"
     )
+    posted_at: Optional[datetime] = Field(
+        None, description="When the job was posted; drives index expiry"
+    )
 
     def as_text(self) -> str:
         """Combine fields into a single text for embedding."""
@@ -41,11 +45,17 @@ class EmbedJobsRequest(BaseModel):
 
     jobs: List[JobToEmbed]
     collection_name: str = Field("jobs", description="ChromaDB collection name")
+    collapse_duplicates: bool = Field(
+        True, description="Skip jobs that near-duplicate an already indexed job"
+    )
 
 
 class EmbedJobsResponse(BaseModel):
     collection_name: str
     count: int
+    duplicates: Dict[str, str] = Field(
+        default_factory=dict, description="Collapsed job id -> canonical job id"
+    )
 
 
 class EmbedQueryRequest(BaseModel):
@@ -59,3 +69,95 @@ class EmbedQueryRequest(BaseModel):
 
 class EmbedQueryResponse(BaseModel):
     embedding: List[float]
+
+
+class StageStats(BaseModel):
+    """Throughput counters for a single ingestion pipeline stage."""
+
+    items_in: int = 0
+    items_out: int = 0
+    busy_seconds: float = 0.0
+    items_per_second: float = 0.0
+
+
+class PipelineRunRequest(BaseModel):
+    """Request body for /pipeline/run.
+
+    Scrapes the given sources, upserts them into `raw_jobs` and embeds the
+    results in-process, without the scraper -> n8n -> Postgres -> n8n ->
+    /embed/jobs round trips.
+    """
+
+    sources: List[str] = Field(
+        default_factory=lambda: ["remotive", "arbeitnow"],
+        description="Scraper source names to ingest",
+    )
+    max_jobs: int = Field(50, ge=1, le=500, description="Max jobs per source")
+    since: Optional[datetime] = None
+    collection_name: str = Field("jobs", description="ChromaDB collection name")
+    batch_size: int = Field(32, ge=1, le=512, description="Max encode batch size")
+    queue_size: int = Field(
+        256, ge=1, description="Capacity of each bounded stage queue"
+    )
+    collapse_duplicates: bool = Field(
+        True, description="Skip jobs that near-duplicate an already indexed job"
+    )
+
+
+class PipelineRunResponse(BaseModel):
+    collection_name: str
+    scraped: int
+    duplicates: int
+    near_duplicates: int = 0
+    # Jobs upserted into raw_jobs, and jobs dropped because they got no row.
+    persisted: int = 0
+    failed: int = 0
+    count: int
+    elapsed_seconds: float
+    stages: Dict[str, StageStats] = Field(default_factory=dict)
+
+
+class IndexMaintenanceRequest(BaseModel):
+    """Request body for /index/maintain.
+
+    Expired jobs are tombstoned first and physically deleted once
+    `grace_days` have passed; `compact` rebuilds the collection afterwards.
+    """
+
+    collection_name: str = Field("jobs", description="ChromaDB collection name")
+    retention_days: Optional[int] = Field(
+        None, ge=1, description="Expire jobs posted longer ago than this"
+    )
+    grace_days: Optional[int] = Field(
+        None, ge=0, description="Keep tombstoned jobs this long before deleting"
+    )
+    batch_size: int = Field(500, ge=1, le=5000, description="Ids per delete/update call")
+    compact: bool = Field(False, description="Rebuild the collection from live jobs")
+    backfill: bool = Field(
+        True, description="Add lifecycle metadata to vectors embedded before expiry existed"
+    )
+
+
+class IndexMaintenanceResponse(BaseModel):
+    collection_name: str
+    backfilled: int
+    expired: int
+    purged: int
+    compacted: bool
+    total: int
+    elapsed_seconds: float
+
+
+class DeactivateJobsRequest(BaseModel):
+    """Request body for /index/deactivate.
+
+    Used to mirror `raw_jobs.is_active = false` into the vector index.
+    """
+
+    ids: List[str] = Field(..., description="Job ids to mark inactive")
+    collection_name: str = Field("jobs", description="ChromaDB collection name")
+
+
+class DeactivateJobsResponse(BaseModel):
+    collection_name: str
+    count: int
@@ -0,0 +1,558 @@
+"""In-process job ingestion pipeline.
+
+Chains scraping, the bulk `raw_jobs` upsert, deduplication, `JobToEmbed`
+conversion, batched encoding and the ChromaDB upsert as streaming stages
+connected by bounded asyncio queues, so fetching, encoding and writing
+overlap and a slow stage applies backpressure to the ones before it.
+
+Vectors are stored under the `raw_jobs.id` returned by the scraper's
+`persist_jobs`, the same id the n8n ingestion workflow uses, so the matcher's
+results can be written to `recommendations.job_id` either way.
+
+Run from the repository checkout with `DATABASE_URL` set (the scraper code is
+imported from `SCRAPER_SERVICE_PATH`, defaulting to the sibling
+`scraper_service/`):
+
+    python pipeline.py --sources remotive arbeitnow --max-jobs 100
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from dedupe import NearDuplicateIndex, get_index
+from instrumentation import batch_bucket, span
+from models import JobToEmbed, PipelineRunResponse, StageStats
+
+
+# Marks the end of a stream on a stage queue.
+_DONE = object()
+
+# Scraper modules loaded by the pipeline; `models` clashes with this service's
+# own top-level module (both services use flat layouts).
+#
+# `instrumentation` is deliberately not swapped: the scraper code runs against
+# the embedder's copy, so its spans land in this process's metrics registry
+# (a second copy would register the same Prometheus metrics twice and fail).
+# `_check_shared_instrumentation` refuses to load the scraper if the two
+# copies have diverged.
+_SCRAPER_MODULES = (
+    "models",
+    "scrapers",
+    "scrapers.remotive",
+    "scrapers.arbeitnow",
+    "sources",
+    "persistence",
+)
+
+_scraper_modules: Optional[Tuple[Any, Any]] = None
+
+
+class UnsupportedSourceError(ValueError):
+    """A requested source is not handled by the scraper service."""
+
+
+class ScraperUnavailableError(RuntimeError):
+    """The scraper service code is not available to this process."""
+
+
+def _check_shared_instrumentation(scraper_path: str) -> None:
+    """Fail if the scraper's `instrumentation.py` differs from ours.
+
+    Each service ships its own copy (they are built from separate
+    directories), but the scraper code loaded here runs against this one.
+    """
+
+    ours = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instrumentation.py")
+    theirs = os.path.join(scraper_path, "instrumentation.py")
+    with open(ours, "rb") as fh:
+        expected = fh.read()
+    try:
+        with open(theirs, "rb") as fh:
+            actual = fh.read()
+    except FileNotFoundError:
+        actual = None
+    if actual != expected:
+        raise ScraperUnavailableError(
+            f"{theirs} differs from {ours}; the instrumentation.py copies in "
+            "scraper_service, embedder_service and matcher_service must be identical"
+        )
+
+
+def _load_scraper_modules():
+    """Import the scraper's `sources` and `persistence` modules without
+    clobbering this service's own `models` module.
+
+    The scraper modules are imported against a temporarily cleared
+    `sys.modules` and then removed again; the loaded functions keep
+    references to their own globals so they continue to work.
+    """
+
+    global _scraper_modules
+
+    if _scraper_modules is not None:
+        return _scraper_modules
+
+    scraper_path = os.path.abspath(
+        os.getenv(
+            "SCRAPER_SERVICE_PATH",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraper_service"),
+        )
+    )
+    if not os.path.isfile(os.path.join(scraper_path, "sources.py")):
+        # The embedder image is built from embedder_service/ alone.
+        raise ScraperUnavailableError(
+            f"Scraper service code not found at {scraper_path}; "
+            "set SCRAPER_SERVICE_PATH to a scraper_service checkout"
+        )
+
+    _check_shared_instrumentation(scraper_path)
+
+    saved = {name: sys.modules.pop(name) for name in _SCRAPER_MODULES if name in sys.modules}
+    sys.path.insert(0, scraper_path)
+    try:
+        sources = importlib.import_module("sources")
+        persistence = importlib.import_module("persistence")
+    finally:
+        sys.path.remove(scraper_path)
+        for name in _SCRAPER_MODULES:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+
+    _scraper_modules = (sources, persistence)
+    return _scraper_modules
+
+
+def load_scrape_source() -> Callable:
+    """Return the scraper service's `scrape_source` dispatcher."""
+
+    return _load_scraper_modules()[0].scrape_source
+
+
+async def close_persistence() -> None:
+    """Close the scraper's Postgres pool if the pipeline opened it."""
+
+    if _scraper_modules is not None:
+        await _scraper_modules[1].close_pool()
+
+
+def check_sources(sources: Sequence[str], supported: Sequence[str]) -> None:
+    """Raise UnsupportedSourceError before any stage starts."""
+
+    unsupported = [name for name in sources if name not in supported]
+    if unsupported:
+        raise UnsupportedSourceError(
+            f"Unsupported source_name: {', '.join(unsupported)} "
+            f"(supported: {', '.join(supported)})"
+        )
+
+
+async def _run_all(*coros):
+    """Like `asyncio.gather`, but cancels the remaining tasks if one fails.
+
+    Plain gather leaves siblings running, and a stage blocked on a full
+    queue would then wait forever.
+    """
+
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def job_metadata(job: JobToEmbed) -> Dict[str, Any]:
+    """Metadata stored alongside each job vector in ChromaDB.
+
+    `active` and `posted_at` (epoch seconds, falling back to indexing time)
+    drive index expiry; re-embedding a job marks it active again. Missing
+    optional fields are left out, as ChromaDB rejects None values.
+    """
+
+    posted_at = job.posted_at or datetime.now(timezone.utc)
+    metadata = {
+        "title": job.title,
+        "company": job.company,
+        "location": job.location,
+        "source_name": job.source_name,
+        "active": True,
+        "posted_at": int(posted_at.timestamp()),
+    }
+    return {key: value for key, value in metadata.items() if value is not None}
+
+
+class _Stage:
+    """Bookkeeping shared by all stages: counters and busy time."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.stats = StageStats()
+
+    def record(self, items_in: int, items_out: int, started: float) -> None:
+        self.stats.items_in += items_in
+        self.stats.items_out += items_out
+        self.stats.busy_seconds += time.perf_counter() - started
+
+    def finish(self) -> StageStats:
+        if self.stats.busy_seconds > 0:
+            self.stats.items_per_second = self.stats.items_out / self.stats.busy_seconds
+        return self.stats
+
+
+async def _fetch_stage(
+    stage: _Stage,
+    scrape_source: Callable,
+    sources: Sequence[str],
+    max_jobs: int,
+    since: Optional[datetime],
+    out: asyncio.Queue,
+) -> None:
+    """Scrape all sources concurrently, forwarding jobs as each source returns."""
+
+    async def fetch_one(source_name: str) -> None:
+        started = time.perf_counter()
+        jobs = await scrape_source(source_name=source_name, max_jobs=max_jobs, since=since)
+        stage.record(1, len(jobs), started)
+        for job in jobs:
+            await out.put(job)
+
+    await _run_all(*(fetch_one(name) for name in sources))
+    await out.put(_DONE)
+
+
+async def _persist_stage(
+    stage: _Stage,
+    persist_jobs: Callable,
+    batch_size: int,
+    inp: asyncio.Queue,
+    out: asyncio.Queue,
+) -> Tuple[int, int]:
+    """Bulk upsert scraped jobs into `raw_jobs` and tag each with its row id.
+
+    Exact duplicates (same `job_url_hash` within this run) are dropped first.
+    Jobs are written in batches of whatever is queued, one transaction per
+    batch. A job without a `raw_jobs` row (no URL hash, or missing from the
+    RETURNING rows) fails and is not embedded. Returns (duplicates, failed).
+    """
+
+    seen = set()
+    duplicates = 0
+    failed = 0
+    done = False
+    while not done:
+        first = await inp.get()
+        if first is _DONE:
+            break
+
+        raw = [first]
+        while len(raw) < batch_size and not inp.empty():
+            item = inp.get_nowait()
+            if item is _DONE:
+                done = True
+                break
+            raw.append(item)
+
+        started = time.perf_counter()
+        batch = []
+        for job in raw:
+            if not job.job_url_hash:
+                failed += 1
+                continue
+            if job.job_url_hash in seen:
+                duplicates += 1
+                continue
+            seen.add(job.job_url_hash)
+            batch.append(job)
+
+        result = await persist_jobs(batch)
+
+        persisted = []
+        for job in batch:
+            row_id = result.ids_by_hash.get(job.job_url_hash)
+            if row_id is None:
+                failed += 1
+                continue
+            persisted.append((row_id, job))
+
+        stage.record(len(raw), len(persisted), started)
+        for item in persisted:
+            await out.put(item)
+
+    await out.put(_DONE)
+    return duplicates, failed
+
+
+async def _convert_stage(
+    stage: _Stage,
+    inp: asyncio.Queue,
+    out: asyncio.Queue,
+    near_duplicates: Optional[NearDuplicateIndex],
+    collection_name: str,
+    batch_size: int,
+    unwritten: set,
+) -> int:
+    """Convert persisted jobs to JobToEmbed, dropping near-duplicates.
+
+    The vector id is the job's `raw_jobs.id`. Jobs are checked against the
+    near-duplicate index, when one is given, in batches of whatever is
+    queued, from a worker thread. Ids registered as canonical are added to
+    `unwritten` until the write stage has stored their vectors. Returns the
+    near-duplicate count.
+    """
+
+    near = 0
+    done = False
+    while not done:
+        first = await inp.get()
+        if first is _DONE:
+            break
+
+        raw = [first]
+        while len(raw) < batch_size and not inp.empty():
+            item = inp.get_nowait()
+            if item is _DONE:
+                done = True
+                break
+            raw.append(item)
+
+        started = time.perf_counter()
+        converted: List[JobToEmbed] = []
+        for row_id, job in raw:
+            with span("pydantic_validation", items=1):
+                converted.append(
+                    JobToEmbed(
+                        id=row_id,
+                        title=job.title,
+                        description=job.description,
+                        company=job.company,
+                        location=job.location,
+                        source_name=job.source_name,
+                        posted_at=job.posted_at,
+                    )
+                )
+
+        if near_duplicates is not None and converted:
+            with span("near_duplicate_check", items=len(converted)):
+                collapsed = await asyncio.to_thread(
+                    near_duplicates.check_many, collection_name, converted
+                )
+            near += len(collapsed)
+            converted = [job for job in converted if job.id not in collapsed]
+            unwritten.update(job.id for job in converted)
+
+        stage.record(len(raw), len(converted), started)
+        for job in converted:
+            await out.put(job)
+
+    await out.put(_DONE)
+    return near
+
+
+async def _encode_stage(
+    stage: _Stage,
+    model,
+    batch_size: int,
+    inp: asyncio.Queue,
+    out: asyncio.Queue,
+) -> None:
+    """Encode jobs in batches.
+
+    Each batch takes whatever is queued (up to `batch_size`), so batches grow
+    naturally while the previous one is encoding. Encoding runs in a worker
+    thread so the event loop keeps fetching in the meantime.
+    """
+
+    done = False
+    while not done:
+        first = await inp.get()
+        if first is _DONE:
+            break
+
+        batch: List[JobToEmbed] = [first]
+        while len(batch) < batch_size and not inp.empty():
+            item = inp.get_nowait()
+            if item is _DONE:
+                done = True
+                break
+            batch.append(item)
+
+        started = time.perf_counter()
+        embeddings = await asyncio.to_thread(_encode, model, batch, batch_size)
+        stage.record(len(batch), len(batch), started)
+        await out.put((batch, embeddings.tolist()))
+
+    await out.put(_DONE)
+
+
+def _encode(model, batch: List[JobToEmbed], batch_size: int):
+    with span(f"model_encode_batch_{batch_bucket(len(batch))}", items=len(batch)):
+        return model.encode(
+            [job.as_text() for job in batch],
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+
+
+def _upsert(collection, batch: List[JobToEmbed], embeddings: List[List[float]]) -> None:
+    with span("chroma_upsert", items=len(batch)):
+        collection.upsert(
+            ids=[job.id for job in batch],
+            embeddings=embeddings,
+            metadatas=[job_metadata(job) for job in batch],
+        )
+
+
+async def _write_stage(stage: _Stage, collection, inp: asyncio.Queue, unwritten: set) -> int:
+    """Upsert encoded batches into ChromaDB. Returns the number written."""
+
+    written = 0
+    while True:
+        item = await inp.get()
+        if item is _DONE:
+            break
+
+        batch, embeddings = item
+        started = time.perf_counter()
+        await asyncio.to_thread(_upsert, collection, batch, embeddings)
+        unwritten.difference_update(job.id for job in batch)
+        written += len(batch)
+        stage.record(len(batch), len(batch), started)
+    return written
+
+
+async def run_pipeline(
+    model,
+    collection,
+    sources: Sequence[str],
+    max_jobs: int = 50,
+    since: Optional[datetime] = None,
+    batch_size: int = 32,
+    queue_size: int = 256,
+    scrape_source: Optional[Callable] = None,
+    supported_sources: Optional[Sequence[str]] = None,
+    persist_jobs: Optional[Callable] = None,
+    near_duplicates: Optional[NearDuplicateIndex] = None,
+) -> PipelineRunResponse:
+    """Scrape `sources`, upsert them into `raw_jobs` and embed the results
+    into `collection`.
+
+    The five stages run concurrently; each queue holds at most `queue_size`
+    items so memory stays bounded even if encoding falls behind fetching.
+    If any stage fails, the others are cancelled and the error is re-raised.
+
+    `scrape_source`, `supported_sources` and `persist_jobs` default to the
+    scraper service's dispatcher, its `SUPPORTED_SOURCES` and its bulk
+    `raw_jobs` writer; unknown sources raise UnsupportedSourceError before
+    anything is fetched.
+    """
+
+    if scrape_source is None or persist_jobs is None:
+        sources_module, persistence = _load_scraper_modules()
+        if scrape_source is None:
+            scrape_source = sources_module.scrape_source
+            supported_sources = supported_sources or sources_module.SUPPORTED_SOURCES
+        if persist_jobs is None:
+            if not os.getenv("DATABASE_URL"):
+                raise ScraperUnavailableError(
+                    "DATABASE_URL is not set; the pipeline writes raw_jobs before embedding"
+                )
+            persist_jobs = persistence.persist_jobs
+    if supported_sources is not None:
+        check_sources(sources, supported_sources)
+
+    stages = {
+        name: _Stage(name) for name in ("fetch", "persist", "convert", "encode", "write")
+    }
+    jobs_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    persisted_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    convert_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    write_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    # Canonical ids in the near-duplicate index whose vectors are not stored yet.
+    unwritten: set = set()
+
+    started = time.perf_counter()
+    try:
+        _, (duplicates, failed), near, _, written = await _run_all(
+            _fetch_stage(stages["fetch"], scrape_source, sources, max_jobs, since, jobs_q),
+            _persist_stage(stages["persist"], persist_jobs, queue_size, jobs_q, persisted_q),
+            _convert_stage(
+                stages["convert"],
+                persisted_q,
+                convert_q,
+                near_duplicates,
+                collection.name,
+                queue_size,
+                unwritten,
+            ),
+            _encode_stage(stages["encode"], model, batch_size, convert_q, write_q),
+            _write_stage(stages["write"], collection, write_q, unwritten),
+        )
+    except BaseException:
+        if near_duplicates is not None and unwritten:
+            # Otherwise later reposts would collapse into vectors that were
+            # never written and never be embedded.
+            await asyncio.to_thread(near_duplicates.remove, collection.name, list(unwritten))
+        raise
+
+    return PipelineRunResponse(
+        collection_name=collection.name,
+        scraped=stages["fetch"].stats.items_out,
+        duplicates=duplicates,
+        near_duplicates=near,
+        persisted=stages["persist"].stats.items_out,
+        failed=failed,
+        count=written,
+        elapsed_seconds=time.perf_counter() - started,
+        stages={name: stage.finish() for name, stage in stages.items()},
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the in-process job ingestion pipeline")
+    parser.add_argument("--sources", nargs="+", default=["remotive", "arbeitnow"])
+    parser.add_argument("--max-jobs", type=int, default=50)
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    parser.add_argument("--collection", default="jobs")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument(
+        "--keep-near-duplicates",
+        action="store_true",
+        help="Embed jobs even if they near-duplicate an already indexed job",
+    )
+    args = parser.parse_args(argv)
+
+    # Importing main loads the model and opens the ChromaDB client.
+    from main import _get_collection, _model
+
+    async def run() -> PipelineRunResponse:
+        try:
+            return await run_pipeline(
+                model=_model,
+                collection=_get_collection(args.collection),
+                sources=args.sources,
+                max_jobs=args.max_jobs,
+                since=args.since,
+                batch_size=args.batch_size,
+                queue_size=args.queue_size,
+                near_duplicates=None if args.keep_near_duplicates else get_index(),
+            )
+        finally:
+            await close_persistence()
+
+    result = asyncio.run(run())
+    print(json.dumps(result.dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
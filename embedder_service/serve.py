@@ -0,0 +1,241 @@
+"""Pre-fork multi-worker server for the embedder service.
+
+    python serve.py --workers 4
+
+Unlike `uvicorn --workers N`, which re-imports `main` (and reloads the model)
+in every worker, this loads the SentenceTransformer once in the parent and
+forks the workers afterwards. The weight tensors are never written during
+inference, so their pages stay shared copy-on-write between all workers.
+
+All ChromaDB and near-duplicate index access goes through one writer
+process (see `vector_store.py`), and each worker's torch intra-op thread pool
+is sized so that workers together use the available cores without
+oversubscribing them.
+
+Workers that exit are restarted with exponential backoff. If a worker keeps
+dying within `STARTUP_GRACE_SECONDS` of being started (e.g. a broken import),
+the server gives up after `MAX_STARTUP_FAILURES` attempts and exits with an
+error instead of respawning forever.
+"""
+
+import argparse
+import gc
+import logging
+import multiprocessing
+import os
+import secrets
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict, Tuple
+
+
+logger = logging.getLogger("embedder.serve")
+
+# A worker that exits sooner than this after being forked failed at startup.
+STARTUP_GRACE_SECONDS = 30.0
+MAX_STARTUP_FAILURES = 5
+RESTART_BACKOFF_SECONDS = 1.0
+MAX_RESTART_BACKOFF_SECONDS = 60.0
+WRITER_START_TIMEOUT_SECONDS = 60.0
+
+
+def _available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - non-Linux
+        return os.cpu_count() or 1
+
+
+def _run_worker(sock: socket.socket, torch_threads: int) -> None:
+    import torch
+    import uvicorn
+
+    import main
+
+    torch.set_num_threads(torch_threads)
+
+    config = uvicorn.Config(main.app, log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _fork_worker(sock: socket.socket, torch_threads: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        # Drop the parent's supervisor handlers; uvicorn installs its own.
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            _run_worker(sock, torch_threads)
+        except BaseException:
+            logger.exception("Worker crashed")
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def main() -> None:
+    cores = _available_cores()
+
+    parser = argparse.ArgumentParser(description="Run the embedder with pre-forked workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8002")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("EMBEDDER_WORKERS", str(cores))))
+    parser.add_argument(
+        "--torch-threads",
+        type=int,
+        default=None,
+        help="Intra-op threads per worker (default: available cores / workers)",
+    )
+    parser.add_argument("--chroma-path", default=os.getenv("CHROMADB_PATH", "chroma_data"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    torch_threads = args.torch_threads or max(1, cores // args.workers)
+
+    # Must be set before prometheus_client is imported so every worker's
+    # metrics land in files that /metrics can aggregate.
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="embedder-metrics-"))
+
+    # 1. Start the single writer before the model is loaded, so it is small.
+    address = os.path.join(tempfile.mkdtemp(prefix="embedder-store-"), "vector_store.sock")
+    authkey = secrets.token_bytes(32)
+    os.environ["VECTOR_STORE_ADDRESS"] = address
+    os.environ["VECTOR_STORE_AUTHKEY"] = authkey.hex()
+
+    from vector_store import run_writer
+
+    writer = multiprocessing.get_context("fork").Process(
+        target=run_writer, args=(args.chroma_path, address, authkey), name="vector-store-writer"
+    )
+    writer.start()
+
+    # 2. Load the model once. No inference happens in the parent: OpenMP
+    # thread pools started before fork() are not usable in the children.
+    import main as embedder_main  # noqa: F401
+
+    # Move everything allocated so far out of the GC's reach, so collections
+    # in the workers don't touch (and un-share) the parent's object pages.
+    gc.collect()
+    gc.freeze()
+
+    # Don't let workers accept requests before the writer is listening.
+    deadline = time.monotonic() + WRITER_START_TIMEOUT_SECONDS
+    while not os.path.exists(address):
+        if not writer.is_alive() or time.monotonic() > deadline:
+            logger.error("Vector store writer did not start; shutting down")
+            writer.terminate()
+            sys.exit(1)
+        time.sleep(0.1)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    # 3. Fork the workers and keep them running.
+    # pid -> (worker index, fork time)
+    workers: Dict[int, Tuple[int, float]] = {}
+    for index in range(args.workers):
+        workers[_fork_worker(sock, torch_threads)] = (index, time.monotonic())
+    logger.info(
+        "Serving on %s:%d with %d workers x %d torch threads",
+        args.host, args.port, args.workers, torch_threads,
+    )
+
+    stopping = False
+    exit_code = 0
+    # Worker index -> consecutive startup failures / time its restart is due.
+    failures: Dict[int, int] = {}
+    restarts: Dict[int, float] = {}
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        restarts.clear()
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    from prometheus_client import multiprocess
+
+    while workers or restarts:
+        now = time.monotonic()
+        for index, due in list(restarts.items()):
+            if due <= now:
+                del restarts[index]
+                workers[_fork_worker(sock, torch_threads)] = (index, now)
+
+        if restarts:
+            # Poll so that due restarts are not held up by a blocking wait.
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if pid == 0:
+                time.sleep(min(0.5, max(0.0, min(restarts.values()) - time.monotonic())))
+                continue
+        else:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+        if pid not in workers:
+            # The writer is a multiprocessing child; it is handled below.
+            if pid == writer.pid and not stopping:
+                logger.error("Vector store writer exited; shutting down")
+                exit_code = 1
+                stop(signal.SIGTERM, None)
+            continue
+
+        index, started = workers.pop(pid)
+        multiprocess.mark_process_dead(pid)
+        if stopping:
+            continue
+
+        code = os.waitstatus_to_exitcode(status)
+        if time.monotonic() - started < STARTUP_GRACE_SECONDS:
+            failures[index] = failures.get(index, 0) + 1
+        else:
+            failures[index] = 0
+
+        if failures[index] >= MAX_STARTUP_FAILURES:
+            logger.error(
+                "Worker %d failed during startup %d times in a row; shutting down",
+                index, failures[index],
+            )
+            exit_code = 1
+            stop(signal.SIGTERM, None)
+            continue
+
+        # A worker that had been serving is restarted straight away.
+        delay = 0.0
+        if failures[index]:
+            delay = min(
+                MAX_RESTART_BACKOFF_SECONDS,
+                RESTART_BACKOFF_SECONDS * 2 ** (failures[index] - 1),
+            )
+        logger.warning(
+            "Worker %d (pid %d) exited with code %d; restarting in %.0fs",
+            index, pid, code, delay,
+        )
+        restarts[index] = time.monotonic() + delay
+
+    writer.terminate()
+    writer.join()
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
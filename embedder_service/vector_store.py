@@ -0,0 +1,264 @@
+"""Single-writer access to ChromaDB for multi-process serving.
+
+`chromadb.PersistentClient` must not be opened by several processes on the
+same `chroma_data` directory. Under `serve.py` one writer process owns the
+only client and every worker reaches it through a multiprocessing manager
+proxy. `RemoteClient`/`RemoteCollection` mirror the subset of the ChromaDB
+client API used by this service, so the rest of the code does not care
+which one it is talking to.
+
+The near-duplicate index is owned by the writer process too: its
+check-then-insert must be atomic across workers, which a per-process lock
+cannot guarantee. `RemoteNearDuplicateIndex` mirrors `NearDuplicateIndex`.
+
+Without `serve.py` the same `VectorStore` runs in-process behind
+`LocalClient`, so writes are serialised by the same lock in both modes;
+compaction relies on that to hold off every other write while it swaps
+the collection.
+"""
+
+import os
+import threading
+from contextlib import nullcontext
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, List, Optional
+
+
+# Collection methods that mutate the store and are therefore serialised.
+_WRITE_METHODS = frozenset({"add", "upsert", "update", "delete", "modify"})
+_READ_METHODS = frozenset({"get", "query", "count", "peek"})
+
+
+class VectorStore:
+    """Lives in the writer process and owns the only PersistentClient."""
+
+    def __init__(self, path: str, near_duplicates=None) -> None:
+        import chromadb
+
+        from dedupe import open_index
+
+        self._client = chromadb.PersistentClient(path=path)
+        self._write_lock = threading.Lock()
+        # Serialised by its own lock; one SQLite connection for all workers.
+        self._near_duplicates = near_duplicates or open_index()
+
+    @staticmethod
+    def _describe(collection) -> Dict[str, Any]:
+        return {"name": collection.name, "metadata": collection.metadata}
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict] = None) -> Dict[str, Any]:
+        with self._write_lock:
+            return self._describe(self._client.get_or_create_collection(name, metadata=metadata))
+
+    def get_collection(self, name: str) -> Dict[str, Any]:
+        return self._describe(self._client.get_collection(name))
+
+    def create_collection(self, name: str, metadata: Optional[Dict] = None) -> Dict[str, Any]:
+        with self._write_lock:
+            return self._describe(self._client.create_collection(name, metadata=metadata))
+
+    def delete_collection(self, name: str) -> None:
+        with self._write_lock:
+            self._client.delete_collection(name)
+
+    def call(self, collection_name: str, method: str, kwargs: Dict[str, Any]) -> Any:
+        if method not in _WRITE_METHODS and method not in _READ_METHODS:
+            raise ValueError(f"Unsupported collection method: {method}")
+
+        lock = self._write_lock if method in _WRITE_METHODS else nullcontext()
+        with lock:
+            collection = self._client.get_collection(collection_name)
+            return getattr(collection, method)(**kwargs)
+
+    def compact(self, name: str, batch_size: int) -> None:
+        """Rebuild `name` from its active vectors, blocking all other writes.
+
+        Holding the write lock throughout means no upsert can land between
+        the copy and the swap, and no `get_or_create_collection` can
+        recreate an empty collection while the original name is free.
+        """
+
+        from index_maintenance import compact_collection
+
+        with self._write_lock:
+            compact_collection(self._client, name, batch_size, self._near_duplicates)
+
+    def near_duplicates_check_prepared(
+        self, collection: str, prepared: List[Any], hasher_params: str
+    ) -> Dict[str, str]:
+        # Signatures are computed by the caller; only the locked lookup and
+        # insert run here, so hashing scales with the number of workers.
+        if hasher_params != self._near_duplicates.hasher.params:
+            raise ValueError(
+                f"MinHash parameters {hasher_params} do not match the index "
+                f"({self._near_duplicates.hasher.params})"
+            )
+        return self._near_duplicates.check_prepared(collection, prepared)
+
+    def near_duplicates_remove(self, collection: str, job_ids: List[str]) -> None:
+        self._near_duplicates.remove(collection, job_ids)
+
+    def near_duplicates_canonical_id(self, collection: str, job_id: str) -> Optional[str]:
+        return self._near_duplicates.canonical_id(collection, job_id)
+
+
+class _ServerManager(BaseManager):
+    pass
+
+
+class _ClientManager(BaseManager):
+    pass
+
+
+_ClientManager.register("get_store")
+
+
+def run_writer(path: str, address: str, authkey: bytes) -> None:
+    """Process target: open the store and serve it until terminated."""
+
+    from index_maintenance import backfill_on_startup
+
+    store = VectorStore(path)
+    # Once for all workers, rather than from every worker's startup hook.
+    threading.Thread(
+        target=backfill_on_startup, args=(LocalClient(store),), daemon=True
+    ).start()
+    _ServerManager.register("get_store", callable=lambda: store)
+    manager = _ServerManager(address=address, authkey=authkey)
+    manager.get_server().serve_forever()
+
+
+class RemoteCollection:
+    """Collection handle whose calls run in the writer process."""
+
+    def __init__(self, client: "RemoteClient", name: str, metadata: Optional[Dict]) -> None:
+        self._client = client
+        self.name = name
+        self.metadata = metadata
+
+    def _call(self, method: str, **kwargs: Any) -> Any:
+        return self._client._store().call(self.name, method, kwargs)
+
+    def add(self, **kwargs: Any) -> None:
+        self._call("add", **kwargs)
+
+    def upsert(self, **kwargs: Any) -> None:
+        self._call("upsert", **kwargs)
+
+    def update(self, **kwargs: Any) -> None:
+        self._call("update", **kwargs)
+
+    def delete(self, **kwargs: Any) -> None:
+        self._call("delete", **kwargs)
+
+    def get(self, **kwargs: Any):
+        return self._call("get", **kwargs)
+
+    def query(self, **kwargs: Any):
+        return self._call("query", **kwargs)
+
+    def count(self) -> int:
+        return self._call("count")
+
+    def modify(self, name: Optional[str] = None, metadata: Optional[Dict] = None) -> None:
+        self._call("modify", name=name, metadata=metadata)
+        if name is not None:
+            self.name = name
+        if metadata is not None:
+            self.metadata = metadata
+
+
+class RemoteClient:
+    """Drop-in for the parts of `chromadb.PersistentClient` this service uses.
+
+    Connects lazily and reconnects after a fork, so it is safe to create in
+    the pre-fork parent and use from every worker.
+    """
+
+    def __init__(self, address: str, authkey: bytes) -> None:
+        self._address = address
+        self._authkey = authkey
+        self._pid: Optional[int] = None
+        self._proxy = None
+
+    def _store(self):
+        if self._pid != os.getpid():
+            manager = _ClientManager(address=self._address, authkey=self._authkey)
+            manager.connect()
+            self._proxy = manager.get_store()
+            self._pid = os.getpid()
+        return self._proxy
+
+    def _collection(self, info: Dict[str, Any]) -> RemoteCollection:
+        return RemoteCollection(self, info["name"], info["metadata"])
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict] = None) -> RemoteCollection:
+        return self._collection(self._store().get_or_create_collection(name, metadata))
+
+    def get_collection(self, name: str) -> RemoteCollection:
+        return self._collection(self._store().get_collection(name))
+
+    def create_collection(self, name: str, metadata: Optional[Dict] = None) -> RemoteCollection:
+        return self._collection(self._store().create_collection(name, metadata))
+
+    def delete_collection(self, name: str) -> None:
+        self._store().delete_collection(name)
+
+    def compact(self, name: str, batch_size: int = 500) -> RemoteCollection:
+        self._store().compact(name, batch_size)
+        return self.get_collection(name)
+
+
+class LocalClient(RemoteClient):
+    """`RemoteClient` interface over a `VectorStore` in this process."""
+
+    def __init__(self, store: VectorStore) -> None:
+        self._local_store = store
+
+    def _store(self) -> VectorStore:
+        return self._local_store
+
+
+class RemoteNearDuplicateIndex:
+    """Drop-in for `dedupe.NearDuplicateIndex` backed by the writer process.
+
+    MinHash signatures are computed in the calling worker.
+    """
+
+    def __init__(self, client: RemoteClient) -> None:
+        from dedupe import MinHasher
+
+        self._client = client
+        self.hasher = MinHasher()
+
+    def check_many(self, collection: str, jobs: List[Any]) -> Dict[str, str]:
+        return self._client._store().near_duplicates_check_prepared(
+            collection, self.hasher.prepare(list(jobs)), self.hasher.params
+        )
+
+    def check_and_add(self, collection: str, job: Any) -> Optional[str]:
+        return self.check_many(collection, [job]).get(job.id)
+
+    def remove(self, collection: str, job_ids: List[str]) -> None:
+        self._client._store().near_duplicates_remove(collection, list(job_ids))
+
+    def canonical_id(self, collection: str, job_id: str) -> Optional[str]:
+        return self._client._store().near_duplicates_canonical_id(collection, job_id)
+
+
+def client_from_env() -> Optional[RemoteClient]:
+    """Return a RemoteClient when running under `serve.py`, else None."""
+
+    address = os.getenv("VECTOR_STORE_ADDRESS")
+    if not address:
+        return None
+    return RemoteClient(address, bytes.fromhex(os.environ["VECTOR_STORE_AUTHKEY"]))
+
+
+def near_duplicates_from_env() -> Optional[RemoteNearDuplicateIndex]:
+    """Return a RemoteNearDuplicateIndex when running under `serve.py`, else None."""
+
+    client = client_from_env()
+    if client is None:
+        return None
+    return RemoteNearDuplicateIndex(client)
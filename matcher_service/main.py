@@ -7,6 +7,7 @@ from chromadb.config import Settings
 import numpy as np
 from dotenv import load_dotenv
 
+from instrumentation import InstrumentedJSONResponse, setup as setup_instrumentation, span
 from models import MatchRequest, JobMatch, MatchResponse
 
 load_dotenv()
@@ -18,8 +19,10 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="JobLens Matcher Service",
     description="Semantic CV-Job matching service using vector embeddings",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=InstrumentedJSONResponse
 )
+setup_instrumentation(app, service="matcher")
 
 # Initialize ChromaDB client
 chroma_client = chromadb.PersistentClient(
@@ -27,6 +30,27 @@ chroma_client = chromadb.PersistentClient(
     settings=Settings(anonymized_telemetry=False)
 )
 
+# Skip jobs tombstoned by the embedder's index maintenance (active=False).
+# Vectors indexed before the flag existed get it from the embedder's backfill,
+# which runs on embedder startup and on every /index/maintain pass.
+MATCH_ACTIVE_ONLY = os.getenv("MATCH_ACTIVE_ONLY", "true").lower() == "true"
+
+
+def build_where_filter(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Build a ChromaDB where clause from request filters
+
+    Multiple conditions are combined with $and, as ChromaDB requires.
+    """
+    conditions = [{key: value} for key, value in (filters or {}).items()]
+    if MATCH_ACTIVE_ONLY:
+        conditions.append({"active": True})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
 
 
 @app.get("/health")
@@ -58,18 +82,16 @@ async def match_cv_to_jobs(request: MatchRequest, background_tasks: BackgroundTa
         cv_embedding_array = [request.cv_embedding]
         
         # Build query filters if provided
-        where_filter = None
-        if request.filters:
-            where_filter = {}
-            for key, value in request.filters.items():
-                where_filter[key] = value
+        where_filter = build_where_filter(request.filters)
         
         # Query the collection
-        results = collection.query(
-            query_embeddings=cv_embedding_array,
-            n_results=request.limit,
-            where=where_filter
-        )
+        with span("chroma_query") as query_span:
+            results = collection.query(
+                query_embeddings=cv_embedding_array,
+                n_results=request.limit,
+                where=where_filter
+            )
+            query_span.items = len(results['ids'][0])
         
         # Format results into JobMatch objects
         jobs = []
@@ -127,18 +149,16 @@ async def match_and_rerank(request: MatchRequest):
         n_initial_results = min(request.limit * 3, 100)  # Get 3x more results for re-ranking
         
         # Build query filters if provided
-        where_filter = None
-        if request.filters:
-            where_filter = {}
-            for key, value in request.filters.items():
-                where_filter[key] = value
+        where_filter = build_where_filter(request.filters)
         
         # Query the collection
-        results = collection.query(
-            query_embeddings=cv_embedding_array,
-            n_results=n_initial_results,
-            where=where_filter
-        )
+        with span("chroma_query") as query_span:
+            results = collection.query(
+                query_embeddings=cv_embedding_array,
+                n_results=n_initial_results,
+                where=where_filter
+            )
+            query_span.items = len(results['ids'][0])
         
         # Prepare jobs for re-ranking
         jobs = []
@@ -157,7 +177,8 @@ async def match_and_rerank(request: MatchRequest):
             jobs.append(job_match)
         
         # Apply re-ranking based on business logic
-        reranked_jobs = apply_business_logic_reranking(jobs, request.cv_embedding, request.filters)
+        with span("rerank", items=len(jobs)):
+            reranked_jobs = apply_business_logic_reranking(jobs, request.cv_embedding, request.filters)
         
         # Take only the top 'limit' results
         top_jobs = reranked_jobs[:request.limit]
@@ -1,14 +1,24 @@
+import logging
 from typing import List
 
 from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 
+from instrumentation import InstrumentedJSONResponse, setup as setup_instrumentation
 from models import JobModel, ScrapeRequest, ScrapeResponse
-from scrapers.remotive import fetch_remotive_jobs
-from scrapers.arbeitnow import fetch_arbeitnow_jobs
+from persistence import PersistResult, close_pool, persist_jobs
+from sources import scrape_source
 
 
-app = FastAPI(title="Job Scraper Service", version="0.1.0")
+app = FastAPI(
+    title="Job Scraper Service",
+    version="0.1.0",
+    default_response_class=InstrumentedJSONResponse,
+)
+setup_instrumentation(app, service="scraper")
+
+logger = logging.getLogger(__name__)
 
 
 @app.get("/health")
@@ -18,12 +28,18 @@ async def health_check() -> dict:
     return {"status": "ok"}
 
 
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await close_pool()
+
+
 @app.post("/scrape", response_model=ScrapeResponse)
 async def scrape_endpoint(payload: ScrapeRequest) -> ScrapeResponse:
     """Scrape jobs for a given source and return them as structured JSON.
 
     n8n will typically call this endpoint on a schedule and then insert the
-    returned jobs into Supabase.
+    returned jobs into Supabase. With `persist=true` the jobs are written to
+    `raw_jobs` here in a single bulk upsert instead.
     """
 
     try:
@@ -48,24 +64,32 @@ async def scrape_endpoint(payload: ScrapeRequest) -> ScrapeResponse:
             ).dict(),
         )
 
+    persisted = PersistResult()
+    if payload.persist:
+        try:
+            persisted = await persist_jobs(jobs)
+        except Exception as exc:
+            # Database errors (including asyncpg's DataError, a ValueError
+            # subclass) are server-side failures. The scraped jobs are still
+            # returned so the caller can fall back to inserting them itself.
+            logger.exception("Persisting %d jobs failed", len(jobs))
+            return JSONResponse(
+                status_code=500,
+                content=jsonable_encoder(
+                    ScrapeResponse(
+                        source_name=payload.source_name,
+                        job_count=len(jobs),
+                        jobs=jobs,
+                        error=f"Persisting jobs failed: {exc}",
+                    )
+                ),
+            )
+
     return ScrapeResponse(
         source_name=payload.source_name,
         job_count=len(jobs),
         jobs=jobs,
+        inserted_ids=persisted.inserted_ids,
+        updated_ids=persisted.updated_ids,
         error=None,
     )
-
-
-async def scrape_source(source_name: str, max_jobs: int, since=None) -> List[JobModel]:
-    """Core scraping dispatcher.
-
-    Dispatches to concrete scraper implementations based on `source_name`.
-    """
-
-    if source_name == "remotive":
-        return await fetch_remotive_jobs(max_jobs=max_jobs, since=since)
-
-    if source_name == "arbeitnow":
-        return await fetch_arbeitnow_jobs(max_jobs=max_jobs, since=since)
-
-    raise ValueError(f"Unsupported source_name: {source_name}")
@@ -94,6 +94,9 @@ class ScrapeRequest(BaseModel):
     source_name: str = Field(..., min_length=1)
     max_jobs: int = Field(50, ge=1, le=500)
     since: Optional[datetime] = None
+    # When true, jobs are bulk upserted into `raw_jobs` by this service
+    # instead of being inserted one by one downstream.
+    persist: bool = False
 
 
 class ScrapeResponse(BaseModel):
@@ -102,4 +105,6 @@ class ScrapeResponse(BaseModel):
     source_name: str
     job_count: int
     jobs: List[JobModel] = Field(default_factory=list)
+    inserted_ids: List[str] = Field(default_factory=list)
+    updated_ids: List[str] = Field(default_factory=list)
     error: Optional[str] = None
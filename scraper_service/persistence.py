@@ -0,0 +1,209 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+from instrumentation import span
+from models import JobModel
+
+
+# Columns written by the scraper. Everything else on `raw_jobs` (id,
+# scraped_at, is_active, embedding_status, ...) is left to database defaults.
+RAW_JOB_COLUMNS: Tuple[str, ...] = (
+    "source_name",
+    "external_id",
+    "job_url",
+    "job_url_hash",
+    "title",
+    "company",
+    "location",
+    "employment_type",
+    "remote_option",
+    "salary_min",
+    "salary_max",
+    "salary_currency",
+    "description",
+    "requirements",
+    "skills",
+    "posted_at",
+)
+
+# Length limits of the VARCHAR columns in `raw_jobs` (supabase/schema.sql).
+# `job_url_hash` is a fixed-length SHA-256 hex digest and is not truncated.
+VARCHAR_LIMITS = {
+    "source_name": 100,
+    "external_id": 255,
+    "title": 500,
+    "company": 255,
+    "location": 255,
+    "employment_type": 100,
+    "remote_option": 100,
+    "salary_currency": 10,
+}
+
+# The staging table mirrors the `raw_jobs` column types but has no NOT NULL,
+# UNIQUE or CHECK constraints; conflicts are resolved in the merge statement.
+# Its VARCHAR limits still apply, so `_to_copy_record` truncates to them
+# (see `VARCHAR_LIMITS`) rather than letting one long title abort the COPY.
+_CREATE_STAGING_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS raw_jobs_staging (
+    source_name VARCHAR(100),
+    external_id VARCHAR(255),
+    job_url TEXT,
+    job_url_hash VARCHAR(64),
+    title VARCHAR(500),
+    company VARCHAR(255),
+    location VARCHAR(255),
+    employment_type VARCHAR(100),
+    remote_option VARCHAR(100),
+    salary_min INTEGER,
+    salary_max INTEGER,
+    salary_currency VARCHAR(10),
+    description TEXT,
+    requirements TEXT,
+    skills TEXT,
+    posted_at TIMESTAMP WITH TIME ZONE
+) ON COMMIT DELETE ROWS
+"""
+
+# DISTINCT ON keeps a single row per hash, otherwise ON CONFLICT would try to
+# update the same target row twice within one statement and abort the batch.
+# `xmax = 0` is only true for freshly inserted tuples, which lets one
+# round-trip report inserted and updated ids separately. `job_url_hash` is
+# returned so callers can map each scraped job to its `raw_jobs.id`.
+_MERGE_SQL = """
+INSERT INTO raw_jobs ({columns})
+SELECT DISTINCT ON (job_url_hash) {columns}
+FROM raw_jobs_staging
+ORDER BY job_url_hash
+ON CONFLICT (job_url_hash) DO UPDATE SET
+    title = EXCLUDED.title,
+    company = EXCLUDED.company,
+    location = EXCLUDED.location,
+    employment_type = EXCLUDED.employment_type,
+    remote_option = EXCLUDED.remote_option,
+    salary_min = EXCLUDED.salary_min,
+    salary_max = EXCLUDED.salary_max,
+    salary_currency = EXCLUDED.salary_currency,
+    description = EXCLUDED.description,
+    requirements = EXCLUDED.requirements,
+    skills = EXCLUDED.skills,
+    posted_at = EXCLUDED.posted_at,
+    scraped_at = NOW(),
+    is_active = TRUE,
+    embedding_status = CASE
+        WHEN raw_jobs.title IS DISTINCT FROM EXCLUDED.title
+          OR raw_jobs.description IS DISTINCT FROM EXCLUDED.description
+        THEN 'pending'
+        ELSE raw_jobs.embedding_status
+    END
+RETURNING id, job_url_hash, (xmax = 0) AS inserted
+""".format(columns=", ".join(RAW_JOB_COLUMNS))
+
+
+_pool: Optional[asyncpg.Pool] = None
+
+
+@dataclass
+class PersistResult:
+    """Outcome of a bulk write into `raw_jobs`."""
+
+    inserted_ids: List[str] = field(default_factory=list)
+    updated_ids: List[str] = field(default_factory=list)
+    # job_url_hash -> raw_jobs.id for every inserted or updated row.
+    ids_by_hash: Dict[str, str] = field(default_factory=dict)
+
+
+async def get_pool() -> asyncpg.Pool:
+    """Return the shared asyncpg pool, creating it on first use.
+
+    The DSN is read from `DATABASE_URL` so the same code runs against
+    Supabase in production and a local Postgres during development.
+    """
+
+    global _pool
+
+    if _pool is None:
+        dsn = os.getenv("DATABASE_URL")
+        if not dsn:
+            raise RuntimeError("DATABASE_URL is not set; cannot persist jobs")
+
+        _pool = await asyncpg.create_pool(
+            dsn=dsn,
+            min_size=int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+            max_size=int(os.getenv("DB_POOL_MAX_SIZE", "5")),
+        )
+    return _pool
+
+
+async def close_pool() -> None:
+    """Close the shared pool if it was opened."""
+
+    global _pool
+
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+async def persist_jobs(jobs: Sequence[JobModel]) -> PersistResult:
+    """Bulk upsert scraped jobs into `raw_jobs`.
+
+    Rows are streamed into a temporary staging table with COPY and then merged
+    with a single `INSERT ... ON CONFLICT (job_url_hash)`, so a batch costs one
+    transaction regardless of its size.
+    """
+
+    result = PersistResult()
+    if not jobs:
+        return result
+
+    records = [_to_copy_record(job) for job in jobs]
+
+    pool = await get_pool()
+    with span("postgres_bulk_upsert", items=len(records)):
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(_CREATE_STAGING_SQL)
+                await conn.copy_records_to_table(
+                    "raw_jobs_staging",
+                    records=records,
+                    columns=RAW_JOB_COLUMNS,
+                )
+                rows = await conn.fetch(_MERGE_SQL)
+
+    for row in rows:
+        job_id = str(row["id"])
+        result.ids_by_hash[row["job_url_hash"]] = job_id
+        if row["inserted"]:
+            result.inserted_ids.append(job_id)
+        else:
+            result.updated_ids.append(job_id)
+    return result
+
+
+def _to_copy_record(job: JobModel) -> tuple:
+    """Convert a JobModel into a tuple matching `RAW_JOB_COLUMNS`.
+
+    `raw_jobs` stores salaries as INTEGER and skills as comma-separated TEXT,
+    so those fields are coerced here; COPY uses the binary protocol and does
+    not perform implicit casts.
+    """
+
+    record = job.to_db_record()
+    record["salary_min"] = _to_int(record["salary_min"])
+    record["salary_max"] = _to_int(record["salary_max"])
+    record["skills"] = ", ".join(record["skills"]) if record["skills"] else None
+    # `company` is NOT NULL in raw_jobs but optional on some sources.
+    record["company"] = record["company"] or ""
+    for column, limit in VARCHAR_LIMITS.items():
+        if record[column] is not None:
+            record[column] = record[column][:limit]
+    return tuple(record[column] for column in RAW_JOB_COLUMNS)
+
+
+def _to_int(value) -> Optional[int]:
+    if value is None:
+        return None
+    return int(value)
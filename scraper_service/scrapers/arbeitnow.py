@@ -4,6 +4,7 @@ from typing import List, Optional
 import httpx
 from bs4 import BeautifulSoup
 
+from instrumentation import span
 from models import JobModel
 
 
@@ -20,8 +21,10 @@ async def fetch_arbeitnow_jobs(
     """
 
     async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(ARBEITNOW_API_URL)
-        response.raise_for_status()
+        with span("http_fetch.arbeitnow") as s:
+            response = await client.get(ARBEITNOW_API_URL)
+            response.raise_for_status()
+            s.nbytes = len(response.content)
         data = response.json()
 
     jobs: List[JobModel] = []
@@ -38,19 +41,20 @@ async def fetch_arbeitnow_jobs(
         if not isinstance(tags, list):
             tags = []
 
-        job = JobModel(
-            source_name="arbeitnow",
-            external_id=str(raw.get("slug") or ""),
-            job_url=raw.get("url") or "",
-            title=raw.get("title") or "",
-            description=description_text,
-            company=raw.get("company_name"),
-            location=raw.get("location"),
-            employment_type=None,
-            remote_option="remote" if raw.get("remote") else None,
-            posted_at=created_at,
-            skills=[str(t) for t in tags],
-        )
+        with span("pydantic_validation", items=1):
+            job = JobModel(
+                source_name="arbeitnow",
+                external_id=str(raw.get("slug") or ""),
+                job_url=raw.get("url") or "",
+                title=raw.get("title") or "",
+                description=description_text,
+                company=raw.get("company_name"),
+                location=raw.get("location"),
+                employment_type=None,
+                remote_option="remote" if raw.get("remote") else None,
+                posted_at=created_at,
+                skills=[str(t) for t in tags],
+            )
         jobs.append(job)
 
     return jobs
@@ -69,5 +73,6 @@ def _html_to_text(html: str) -> str:
     if not html:
         return ""
 
-    soup = BeautifulSoup(html, "html.parser")
-    return soup.get_text(separator="\n").strip()
+    with span("html_parse", items=1, nbytes=len(html)):
+        soup = BeautifulSoup(html, "html.parser")
+        return soup.get_text(separator="\n").strip()
@@ -4,6 +4,7 @@ from typing import List, Optional
 import httpx
 from bs4 import BeautifulSoup
 
+from instrumentation import span
 from models import JobModel
 
 
@@ -29,8 +30,10 @@ async def fetch_remotive_jobs(
         params["category"] = category
 
     async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.get(REMOTIVE_API_URL, params=params)
-        response.raise_for_status()
+        with span("http_fetch.remotive") as s:
+            response = await client.get(REMOTIVE_API_URL, params=params)
+            response.raise_for_status()
+            s.nbytes = len(response.content)
         data = response.json()
 
     jobs: List[JobModel] = []
@@ -43,18 +46,19 @@ async def fetch_remotive_jobs(
         description_html = raw.get("description") or ""
         description_text = _html_to_text(description_html)
 
-        job = JobModel(
-            source_name="remotive",
-            external_id=str(raw.get("id")),
-            job_url=raw.get("url") or "",
-            title=raw.get("title") or "",
-            description=description_text,
-            company=raw.get("company_name"),
-            location=raw.get("candidate_required_location"),
-            employment_type=_map_job_type(raw.get("job_type")),
-            remote_option="remote",
-            posted_at=publication_date,
-        )
+        with span("pydantic_validation", items=1):
+            job = JobModel(
+                source_name="remotive",
+                external_id=str(raw.get("id")),
+                job_url=raw.get("url") or "",
+                title=raw.get("title") or "",
+                description=description_text,
+                company=raw.get("company_name"),
+                location=raw.get("candidate_required_location"),
+                employment_type=_map_job_type(raw.get("job_type")),
+                remote_option="remote",
+                posted_at=publication_date,
+            )
         jobs.append(job)
 
     return jobs
@@ -88,5 +92,6 @@ def _html_to_text(html: str) -> str:
     if not html:
         return ""
 
-    soup = BeautifulSoup(html, "html.parser")
-    return soup.get_text(separator="\n").strip()
+    with span("html_parse", items=1, nbytes=len(html)):
+        soup = BeautifulSoup(html, "html.parser")
+        return soup.get_text(separator="\n").strip()
@@ -0,0 +1,25 @@
+from typing import List
+
+from models import JobModel
+from scrapers.remotive import fetch_remotive_jobs
+from scrapers.arbeitnow import fetch_arbeitnow_jobs
+
+
+SUPPORTED_SOURCES = ("remotive", "arbeitnow")
+
+
+async def scrape_source(source_name: str, max_jobs: int, since=None) -> List[JobModel]:
+    """Core scraping dispatcher.
+
+    Dispatches to concrete scraper implementations based on `source_name`.
+    Kept free of FastAPI and database imports so other services (e.g. the
+    embedder's ingestion pipeline) can reuse it in-process.
+    """
+
+    if source_name == "remotive":
+        return await fetch_remotive_jobs(max_jobs=max_jobs, since=since)
+
+    if source_name == "arbeitnow":
+        return await fetch_arbeitnow_jobs(max_jobs=max_jobs, since=since)
+
+    raise ValueError(f"Unsupported source_name: {source_name}")